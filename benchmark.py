@@ -0,0 +1,244 @@
+"""
+Reproducible benchmark of the solvers.
+
+Every solver is run headless (-o) over a grid of city counts (-c),
+population sizes (-n) and fixed seeds (--seed), from the datasets
+directory, and the telemetry of each run is summarized into one JSON file
+that can be compared across commits:
+
+    python benchmark.py -c 10,30 -n 50,100 -s 1,2,3 -o results.json
+    python benchmark.py -o new.json -b results.json
+
+For each run it keeps the wall time, the time of each phase of the solver,
+the evaluations per second, the best cost (or the hypervolume of the Pareto
+archive for evolutionaryMO.py) against the evaluations, and the time and
+evaluations it took to reach the target quality: within a tolerance of the
+best final result of any run on the same solver and city count.
+"""
+
+import getopt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROGRAMS = ["evolutionary.py", "evolutionaryTransport.py", "evolutionaryMO.py"]
+
+
+def metric(program):
+    """Name of the quality measure of a solver in its telemetry and whether it is maximized."""
+    if program == "evolutionaryMO.py":
+        return "hv_pareto", True
+    return "best", False
+
+
+def run(program, cities, population, seed, extra=(), datasets="datasets", timeout=None):
+    """
+    Run one solver headless and summarize its telemetry.
+
+    Returns:
+    - dict with the parameters of the run, its wall time, phases, evaluations,
+      final quality and trace of (evaluations, time, quality) per generation,
+      and for evolutionaryMO.py the (cost, time) of its final archive and the
+      reference point of its hypervolume.
+    """
+    name, maximize = metric(program)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), program)
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    command = [sys.executable, script, "-c", str(cities), "-n", str(population), "--seed", str(seed), "-o", path] + list(extra)
+    try:
+        started = time.perf_counter()
+        subprocess.run(command, cwd=datasets, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True, timeout=timeout)
+        wall = time.perf_counter() - started
+        with open(path, "r") as fp:
+            records = [json.loads(line) for line in fp if line.strip()]
+    finally:
+        os.remove(path)
+
+    trace = [[r["evaluations"], r["time"], r[name]] for r in records if r["type"] == "generation"]
+    end = records[-1]
+    evolve = end["phases"].get("evolve", end["time"])
+    return {
+        "program": program,
+        "cities": cities,
+        "population": population,
+        "seed": seed,
+        "args": list(extra),
+        "wall": wall,
+        "time": end["time"],
+        "phases": end["phases"],
+        "generations": end["g"],
+        "evaluations": end["evaluations"],
+        "evals_per_sec": end["evaluations"] / end["time"] if end["time"] > 0 else None,
+        "evolve_evals_per_sec": (end["evaluations"] - (trace[0][0] if trace else 0)) / evolve if evolve > 0 else None,
+        "metric": name,
+        "final": end[name],
+        "cache_hits": end.get("cache_hits"),
+        "stop": end.get("stop"),
+        "front": [entry[-1] for entry in end["pareto"]] if "pareto" in end else None,
+        "ref": end.get("ref"),
+        "trace": trace,
+    }
+
+
+def reach_targets(runs, tolerance):
+    """
+    Set the target of each run and the time/evaluations it took to reach it:
+    the best final quality over the runs of the same solver and city count,
+    relaxed by tolerance (a fraction of it).
+    """
+    for key in {(r["program"], r["cities"]) for r in runs}:
+        group = [r for r in runs if (r["program"], r["cities"]) == key]
+        name, maximize = metric(key[0])
+        finals = [r["final"] for r in group if r["final"] is not None]
+        if not finals:
+            continue
+        best = max(finals) if maximize else min(finals)
+        target = best * (1 - tolerance) if maximize else best * (1 + tolerance)
+        for r in group:
+            r["target"] = target
+            r["time_to_target"] = r["evals_to_target"] = None
+            for evaluations, elapsed, value in r["trace"]:
+                if (value >= target) if maximize else (value <= target):
+                    r["time_to_target"], r["evals_to_target"] = elapsed, evaluations
+                    break
+
+
+def summarize(runs):
+    """Median over the seeds of each (program, cities, population) cell."""
+    cells = {}
+    for r in runs:
+        cells.setdefault((r["program"], r["cities"], r["population"]), []).append(r)
+    summary = []
+    for (program, cities, population), group in cells.items():
+        def median(field):
+            values = [r[field] for r in group if r.get(field) is not None]
+            return statistics.median(values) if values else None
+        summary.append({
+            "program": program,
+            "cities": cities,
+            "population": population,
+            "runs": len(group),
+            "reached": sum(r.get("time_to_target") is not None for r in group),
+            "time": median("time"),
+            "evals_per_sec": median("evals_per_sec"),
+            "final": median("final"),
+            "time_to_target": median("time_to_target"),
+            "evals_to_target": median("evals_to_target"),
+        })
+    return summary
+
+
+def commit():
+    # Commit of the benchmarked tree, None outside of a git checkout
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return head + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(summary, baseline):
+    """Print the ratio of the medians of summary to those of a baseline summary."""
+    old = {(s["program"], s["cities"], s["population"]): s for s in baseline}
+    print("\n%-26s %6s %6s %14s %14s" % ("vs baseline", "cities", "pop", "evals/sec", "final"))
+    for s in summary:
+        b = old.get((s["program"], s["cities"], s["population"]))
+        if b is None:
+            continue
+        speed = s["evals_per_sec"] / b["evals_per_sec"] if s["evals_per_sec"] and b["evals_per_sec"] else None
+        final = s["final"] / b["final"] if s["final"] and b["final"] else None
+        print("%-26s %6i %6i %14s %14s" % (s["program"], s["cities"], s["population"],
+                                           "-" if speed is None else "x%.2f" % speed,
+                                           "-" if final is None else "x%.3f" % final))
+
+
+def main():
+    argList = sys.argv[1:]
+    options = "hp:c:n:s:a:q:o:d:t:b:"
+    programs = PROGRAMS
+    cityNs = [10, 30]
+    popNs = [100]
+    seeds = [1, 2, 3]
+    extra = []
+    tolerance = 0.05
+    outPath = "benchmark.json"
+    datasets = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets")
+    timeout = None
+    baselinePath = None
+    try:
+        arguments, values = getopt.getopt(argList, options, "")
+        for arg, value in arguments:
+            if arg == "-h":
+                print("-p Solvers to run, comma separated Default: %s\n-c City counts, comma separated Default: 10,30\n-n Population sizes, comma separated Default: 100\n-s Seeds, comma separated Default: 1,2,3\n-a Extra arguments for the solvers, e.g. \"-e delta -l 1000\" Default: none\n-q Tolerance of the target quality, fraction of the best final result Default: 0.05\n-o Output .json file Default: benchmark.json\n-d Datasets directory the solvers run from Default: datasets\n-t Timeout of a run in seconds Default: none\n-b Baseline .json file to compare with Default: none" % ",".join(PROGRAMS))
+                exit()
+            elif arg == "-p":
+                programs = value.split(",")
+            elif arg == "-c":
+                cityNs = [int(v) for v in value.split(",")]
+            elif arg == "-n":
+                popNs = [int(v) for v in value.split(",")]
+            elif arg == "-s":
+                seeds = [int(v) for v in value.split(",")]
+            elif arg == "-a":
+                extra = value.split()
+            elif arg == "-q":
+                tolerance = float(value)
+            elif arg == "-o":
+                outPath = value
+            elif arg == "-d":
+                datasets = value
+            elif arg == "-t":
+                timeout = float(value)
+            elif arg == "-b":
+                baselinePath = value
+
+    except getopt.error as err:
+        print(str(err))
+
+    runs = []
+    print("%-26s %6s %6s %5s %9s %11s %14s" % ("program", "cities", "pop", "seed", "time", "evals/sec", "final"))
+    for program in programs:
+        for cityN in cityNs:
+            for popN in popNs:
+                for seed in seeds:
+                    r = run(program, cityN, popN, seed, extra, datasets, timeout)
+                    runs.append(r)
+                    print("%-26s %6i %6i %5i %9.2f %11.0f %14.6g" % (program, cityN, popN, seed, r["time"], r["evals_per_sec"] or 0, r["final"]))
+
+    reach_targets(runs, tolerance)
+    summary = summarize(runs)
+    results = {
+        "commit": commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "args": extra,
+        "tolerance": tolerance,
+        "summary": summary,
+        "runs": runs,
+    }
+    with open(outPath, "w") as fp:
+        json.dump(results, fp, indent=1)
+
+    print("\n%-26s %6s %6s %9s %11s %14s %14s" % ("median", "cities", "pop", "time", "evals/sec", "final", "to target (s)"))
+    for s in summary:
+        print("%-26s %6i %6i %9.2f %11.0f %14.6g %14s" % (s["program"], s["cities"], s["population"], s["time"], s["evals_per_sec"] or 0, s["final"],
+                                                   "-" if s["time_to_target"] is None else "%.2f (%i/%i)" % (s["time_to_target"], s["reached"], s["runs"])))
+    print("Results saved to %s" % outPath)
+
+    if baselinePath is not None:
+        with open(baselinePath, "r") as fp:
+            compare(summary, json.load(fp)["summary"])
+
+
+if __name__ == "__main__":
+    main()
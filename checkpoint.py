@@ -0,0 +1,149 @@
+"""
+Checkpoints of a run, to resume it after it is killed or preempted.
+
+A checkpoint is one .npz file of plain arrays (no pickled DEAP individuals):
+the genomes and fitnesses of the population, of the Pareto archive and of
+the fitness cache, the state of the random module and a small JSON header
+with the counters (evaluations, generation, ...) and the run parameters.
+It is written to a temporary file first and renamed, so a run killed while
+writing keeps the previous checkpoint.
+
+The population keeps which of its entries are the same individual
+(selection repeats individuals), so a resumed run continues exactly as the
+interrupted one would have.
+"""
+
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+
+class Schedule:
+    """
+    When to checkpoint: every "N" generations or every "Ns" seconds.
+
+    Parameters:
+    - every: "10" for every 10 generations, "60s" for every 60 seconds.
+    """
+
+    def __init__(self, every):
+        self.seconds = float(every[:-1]) if every.endswith("s") else None
+        self.generations = None if self.seconds is not None else int(every)
+        self.last = time.monotonic()
+
+    def due(self, g):
+        if self.seconds is None:
+            return g % self.generations == 0
+        if time.monotonic() - self.last >= self.seconds:
+            self.last = time.monotonic()
+            return True
+        return False
+
+
+def pack(individuals, prefix):
+    """
+    Arrays of a list of individuals: prefix + "genes" (the distinct
+    individuals as (U, N) or (U, 2, N) int16), prefix + "fitness" (U,
+    objectives) and prefix + "alias" (index of each entry in genes).
+    """
+    unique = {}
+    alias = [unique.setdefault(id(ind), len(unique)) for ind in individuals]
+    distinct = {k: ind for ind, k in zip(individuals, alias)}
+    ordered = [distinct[k] for k in range(len(distinct))]
+    return {
+        prefix + "genes": np.array([[list(gene) for gene in ind] if isinstance(ind[0], list) else list(ind) for ind in ordered], dtype=np.int16),
+        prefix + "fitness": np.array([ind.fitness.values for ind in ordered], dtype=float),
+        prefix + "alias": np.array(alias, dtype=np.int64),
+    }
+
+
+def unpack(arrays, prefix, Individual):
+    """Inverse of pack, individuals of class Individual with their fitness."""
+    distinct = []
+    for genes, fit in zip(arrays[prefix + "genes"].tolist(), arrays[prefix + "fitness"].tolist()):
+        ind = Individual(genes)
+        ind.fitness.values = fit
+        distinct.append(ind)
+    return [distinct[k] for k in arrays[prefix + "alias"].tolist()]
+
+
+def save(path, header, **arrays):
+    """Write header (a JSON-able dict), the arrays and the random module state to path."""
+    version, state, gauss = random.getstate()
+    header = dict(header, random=[version, gauss])
+    tmpPath = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmpPath, "wb") as fp:
+        np.savez(fp, header=np.array(json.dumps(header)), random=np.array(state, dtype=np.uint64), **arrays)
+    os.replace(tmpPath, path)
+
+
+def load(path):
+    """
+    Read a checkpoint written by save and restore the random module state.
+
+    Returns:
+    - The header dict and a dict of the arrays.
+    """
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    header = json.loads(str(arrays.pop("header")))
+    version, gauss = header.pop("random")
+    random.setstate((version, tuple(arrays.pop("random").tolist()), gauss))
+    return header, arrays
+
+
+def check(header, **parameters):
+    """Raise ValueError if the run parameters differ from those of the checkpoint."""
+    for name, value in parameters.items():
+        if header.get(name) != value:
+            raise ValueError("checkpoint was written with %s=%s, not %s" % (name, header.get(name), value))
+
+
+def save_run(path, pop, e, g, cache=None, archive=None, termination=None, **parameters):
+    """
+    Checkpoint the state of a solver at the end of generation g.
+
+    Parameters:
+    - pop: The population, e: the evaluations so far.
+    - cache: Optional evaluation.FitnessCache.
+    - archive: Optional moea.ParetoArchive.
+    - termination: Optional termination.Termination.
+    - parameters: Run parameters load_run checks (e.g. cities, population).
+    """
+    arrays = pack(pop, "pop_")
+    header = dict(parameters, evaluations=e, generation=g)
+    if cache is not None:
+        arrays["cache_keys"], arrays["cache_fitness"], header["cache_hits"], header["cache_misses"] = cache.state()
+    if archive is not None:
+        arrays.update(pack(list(archive), "archive_"))
+        if archive.hv is not None:
+            header["hypervolume"] = archive.hypervolume
+    if termination is not None:
+        header["termination"] = termination.state()
+    save(path, header, **arrays)
+
+
+def load_run(path, Individual, cache=None, archive=None, termination=None, **parameters):
+    """
+    Restore a run checkpointed by save_run: the random module state, the
+    cache, the (empty) archive and the termination given, checking the run
+    parameters.
+
+    Returns:
+    - The population, the evaluations and the generation.
+    """
+    header, arrays = load(path)
+    check(header, **parameters)
+    pop = unpack(arrays, "pop_", Individual)
+    if cache is not None:
+        cache.restore(arrays["cache_keys"], arrays["cache_fitness"], header["cache_hits"], header["cache_misses"])
+    if archive is not None:
+        archive.update(unpack(arrays, "archive_", Individual))
+        if "hypervolume" in header:
+            archive.hv.value = header["hypervolume"]
+    if termination is not None and "termination" in header:
+        termination.restore(header["termination"])
+    return pop, header["evaluations"], header["generation"]
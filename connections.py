@@ -0,0 +1,153 @@
+"""
+Multimodal layover connections between cities, for cost and time.
+
+The train/plane/bus links form one graph with up to three edges per pair of
+cities. From every origin a bi-objective label-setting search (Martins'
+algorithm) finds all the non-dominated (cost, time) routes: labels are
+expanded by increasing cost from a heap, and a label is dropped as soon as
+another label of the same city is at least as good in both objectives.
+
+Each pair of cities keeps a small Pareto set of its routes with at least one
+layover (the direct links are already transports of their own). Stacked as
+extra layers of the cost/time tensors they act as virtual transports, so a
+solver can cross a missing link through a layover city:
+
+    costs, times, paths = connections.load("datasets/", cityN=30)
+    costM = np.concatenate((costM, costs))
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+import decoders
+import matrices
+
+
+def _search(costT, timeT, edges, origin, maxHops):
+    # Non-dominated labels of every city from origin. Each city keeps its
+    # labels sorted by cost (so by decreasing time), label k is
+    # (cost, time, city, hops, parent label, transport)
+    n = len(edges)
+    labels = []
+    costs = [[] for city in range(n)]
+    times = [[] for city in range(n)]
+    ids = [[] for city in range(n)]
+    alive = []
+
+    def add(c, t, city, hops, parent, mode):
+        cs, ts = costs[city], times[city]
+        k = bisect_right(cs, c)
+        if k > 0 and ts[k - 1] <= t:
+            return
+        m = bisect_left(cs, c)
+        end = m
+        while end < len(cs) and ts[end] >= t:
+            alive[ids[city][end]] = False
+            end += 1
+        del cs[m:end], ts[m:end], ids[city][m:end]
+        cs.insert(m, c)
+        ts.insert(m, t)
+        ids[city].insert(m, len(labels))
+        labels.append((c, t, city, hops, parent, mode))
+        alive.append(True)
+        heapq.heappush(heap, (c, t, len(labels) - 1))
+
+    heap = []
+    add(0.0, 0.0, origin, 0, -1, -1)
+    while heap:
+        c, t, k = heapq.heappop(heap)
+        if not alive[k]:
+            continue
+        city, hops = labels[k][2], labels[k][3]
+        if maxHops is not None and hops >= maxHops:
+            continue
+        for mode, b in edges[city]:
+            add(c + costT[mode][city][b], t + timeT[mode][city][b], b, hops + 1, k, mode)
+
+    return labels, ids
+
+
+def _path(labels, k):
+    # (city, transport) hops of label k, origin excluded
+    path = []
+    while labels[k][4] >= 0:
+        path.append((labels[k][2], labels[k][5]))
+        k = labels[k][4]
+    return path[::-1]
+
+
+def pareto_connections(costT, timeT, maxsize=4, maxHops=None):
+    """
+    Non-dominated routes with layovers between all pairs of cities.
+
+    Parameters:
+    - costT, timeT: (modes, N, N) cost and time tensors, inf for missing links.
+    - maxsize: Largest number of routes kept per pair, evenly spread along
+      the front (extremes included) when there are more.
+    - maxHops: Optional limit on the number of links of a route.
+
+    Returns:
+    - (maxsize, N, N) costs and times of the routes of each pair sorted by
+      cost (inf where there are fewer), and the (maxsize, N, N, H, 2) int16
+      array of their (city, transport) hops, origin excluded and padded
+      with -1, H being the most links of a kept route.
+    """
+    costT, timeT = np.asarray(costT), np.asarray(timeT)
+    n = costT.shape[1]
+    mask = decoders.nondominated_modes(costT, timeT)
+    edges = [[(int(m), int(b)) for m, b in zip(*np.nonzero(mask[:, a, :])) if b != a] for a in range(n)]
+    costRows, timeRows = costT.tolist(), timeT.tolist()
+
+    costs = np.full((maxsize, n, n), np.inf)
+    times = np.full((maxsize, n, n), np.inf)
+    routes = {}
+    for a in range(n):
+        labels, ids = _search(costRows, timeRows, edges, a, maxHops)
+        for b in range(n):
+            if b == a:
+                continue
+            # Direct links are left to the real transports
+            keep = [k for k in ids[b] if labels[k][3] > 1]
+            if len(keep) > maxsize:
+                keep = [keep[i] for i in np.unique(np.linspace(0, len(keep) - 1, maxsize).round().astype(int))]
+            for slot, k in enumerate(keep):
+                costs[slot, a, b], times[slot, a, b] = labels[k][0], labels[k][1]
+                routes[slot, a, b] = _path(labels, k)
+
+    hops = max((len(path) for path in routes.values()), default=0)
+    paths = np.full((maxsize, n, n, hops, 2), -1, dtype=np.int16)
+    for (slot, a, b), path in routes.items():
+        paths[slot, a, b, :len(path)] = path
+    return costs, times, paths
+
+
+def load(prefix="", cityN=None, maxsize=4, maxHops=None, cache=True):
+    """
+    pareto_connections of the datasets prefix + "cost"/"time" + mode + ".csv",
+    kept in the matrix cache.
+
+    Returns:
+    - The costs, times and paths of pareto_connections.
+    """
+    csvNames = [prefix + kind + mode + ".csv" for kind in ("cost", "time") for mode in matrices.MODES]
+    cities, tensor = matrices.load_tensor(csvNames, cityN, cache)
+    modeN = len(matrices.MODES)
+    tag = "connections%d.%s.%s" % (maxsize, maxHops, len(cities))
+
+    built = {}
+
+    def build():
+        if not built:
+            built["value"] = pareto_connections(tensor[:modeN], tensor[modeN:], maxsize, maxHops)
+        return built["value"]
+
+    values = matrices.cached(csvNames, tag + ".values", lambda: np.stack(build()[:2]), cache)
+    paths = matrices.cached(csvNames, tag + ".paths", lambda: build()[2], cache)
+    return values[0], values[1], paths
+
+
+def expand(paths, slot, a, b):
+    """(city, transport) hops of connection slot from a to b, origin excluded."""
+    return [(int(city), int(mode)) for city, mode in paths[slot, a, b] if city >= 0]
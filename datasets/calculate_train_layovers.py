@@ -1,63 +1,96 @@
 import pandas as pd
 import numpy as np
 
-# Load the CSV file into a DataFrame
-file_path = 'costtrain.csv'
-time_path = 'timetrain.csv'
-cost_df = pd.read_csv(file_path)
-time_df = pd.read_csv(time_path)
-
-# Replace '-' with NaN to mark missing connections, and set the 'City' column as index
-cost_df.replace('-', np.nan, inplace=True)
-cost_df.set_index('City', inplace=True)
-time_df.replace('-', np.nan, inplace=True)
-time_df.set_index('City', inplace=True)
-
-# Convert data to numeric where possible
-cost_df = cost_df.apply(pd.to_numeric, errors='coerce')
-time_df = time_df.apply(pd.to_numeric, errors='coerce')
-
-# Calculate layover connections
-for city_from in cost_df.index:
-    for city_to in cost_df.columns:
-        # Skip if there's already a direct connection
-        if not np.isnan(cost_df.loc[city_from, city_to]):
-            continue
-
-        # Lists to hold possible layover costs and times
-        possible_layover_costs = []
-        possible_layover_times = []
-        for layover_city in cost_df.index:
-            # Check for a valid layover route in both cost and time matrices
-            if (layover_city != city_from and layover_city != city_to
-                and not np.isnan(cost_df.loc[city_from, layover_city])
-                and not np.isnan(cost_df.loc[layover_city, city_to])
-                and not np.isnan(time_df.loc[city_from, layover_city])
-                and not np.isnan(time_df.loc[layover_city, city_to])):
-
-                # Calculate layover cost and time, converting to int
-                layover_cost = int(cost_df.loc[city_from, layover_city] + cost_df.loc[layover_city, city_to])
-                layover_time = int(time_df.loc[city_from, layover_city] + time_df.loc[layover_city, city_to])
-                possible_layover_costs.append(layover_cost)
-                possible_layover_times.append(layover_time)
-
-        # If there are valid layover routes, pick the minimum cost and the corresponding time
-        if possible_layover_costs and possible_layover_times:
-            min_cost_index = possible_layover_costs.index(min(possible_layover_costs))
-            cost_df.loc[city_from, city_to] = possible_layover_costs[min_cost_index]
-            time_df.loc[city_from, city_to] = possible_layover_times[min_cost_index]
-
-
-cost_df = cost_df.fillna(0).astype(int)
-# Save the updated DataFrame back to a CSV file
-cost_df.replace(0, '-', inplace=True)
-output_path = 'updated_cost_matrix.csv'
-cost_df.to_csv(output_path)
-
-time_df = time_df.fillna(0).astype(int)
-# Save the updated DataFrame back to a CSV file
-time_df.replace(0, '-', inplace=True)
-output_path = 'updated_time_matrix.csv'
-time_df.to_csv(output_path)
-
-print(f"Updated cost matrix with layovers saved to {output_path}")
+# Fills the missing train links with the cheapest route through any number of
+# layover cities, and takes the time of that route.
+#
+# The all-pairs cheapest routes come from a min-plus Floyd-Warshall over the
+# whole matrices: for each city k in turn, every pair (a, b) whose route
+# through k is cheaper takes it, as one array operation. The predecessor index
+# keeps the city before b on the route from a to b, so the route itself can be
+# rebuilt with layover_route.
+
+
+def floyd_warshall(cost, time):
+    """
+    Cheapest routes between all pairs of cities.
+
+    Parameters:
+    - cost, time: (N, N) float arrays of the direct links, nan where there is
+      no link. A link is usable only when both its cost and its time are known.
+
+    Returns:
+    - The (N, N) cost and time of the cheapest routes (inf when there is none)
+      and the predecessor index: predecessor[a, b] is the city before b on the
+      route from a to b, -1 when there is no route.
+    """
+    n = len(cost)
+    linked = ~(np.isnan(cost) | np.isnan(time))
+    np.fill_diagonal(linked, False)
+    cost = np.where(linked, cost, np.inf)
+    time = np.where(linked, time, np.inf)
+    predecessor = np.where(linked, np.arange(n)[:, np.newaxis], -1)
+
+    for k in range(n):
+        via = cost[:, k, np.newaxis] + cost[np.newaxis, k, :]
+        better = via < cost
+        np.fill_diagonal(better, False)
+        cost = np.where(better, via, cost)
+        time = np.where(better, time[:, k, np.newaxis] + time[np.newaxis, k, :], time)
+        predecessor = np.where(better, predecessor[np.newaxis, k, :], predecessor)
+
+    return cost, time, predecessor
+
+
+def layover_route(predecessor, a, b):
+    """Cities of the route from a to b (both included), None if there is none."""
+    if predecessor[a, b] < 0:
+        return None
+    route = [b]
+    while route[-1] != a:
+        route.append(int(predecessor[a, route[-1]]))
+    return route[::-1]
+
+
+def read_matrix(path):
+    # 'City' column as index, '-' (missing connection) as nan
+    df = pd.read_csv(path)
+    df.replace('-', np.nan, inplace=True)
+    df.set_index('City', inplace=True)
+    return df.apply(pd.to_numeric, errors='coerce')
+
+
+def write_matrix(df, values, path):
+    # Same format as the input files, '-' for no connection
+    df = pd.DataFrame(np.where(np.isfinite(values), values, 0).astype(int), index=df.index, columns=df.columns)
+    df.replace(0, '-', inplace=True)
+    df.to_csv(path)
+
+
+if __name__ == "__main__":
+    # Load the CSV files into DataFrames
+    file_path = 'costtrain.csv'
+    time_path = 'timetrain.csv'
+    cost_df = read_matrix(file_path)
+    time_df = read_matrix(time_path)
+
+    cost = cost_df.to_numpy(dtype=float)
+    time = time_df.to_numpy(dtype=float)
+    routeCost, routeTime, predecessor = floyd_warshall(cost, time)
+
+    # Direct connections are kept, the missing ones take the cheapest route
+    missing = np.isnan(cost)
+    cost = np.where(missing, routeCost, cost)
+    time = np.where(missing, routeTime, time)
+
+    write_matrix(cost_df, cost, 'updated_cost_matrix.csv')
+    write_matrix(time_df, time, 'updated_time_matrix.csv')
+
+    # Binary form of the same matrices with the routes, for the solvers:
+    #   np.load('updated_layovers.npz') has cities, cost, time (inf for no
+    #   connection) and predecessor (see layover_route)
+    np.fill_diagonal(cost, np.inf)
+    np.fill_diagonal(time, np.inf)
+    np.savez_compressed('updated_layovers.npz', cities=np.array(cost_df.index), cost=cost, time=time, predecessor=predecessor)
+
+    print("Updated matrices with layovers saved to updated_cost_matrix.csv, updated_time_matrix.csv and updated_layovers.npz")
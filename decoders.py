@@ -0,0 +1,95 @@
+"""
+Decoders assigning the transport of each leg of a tour.
+
+For a fixed tour the transports of the legs can be chosen exactly instead of
+being evolved: the cheapest one for a single objective, or the set of
+non-dominated assignments for cost and time.
+"""
+
+import numpy as np
+
+
+def best_modes(tensor):
+    """
+    Cheapest transport of every (origin, destination) pair.
+
+    Parameters:
+    - tensor: (modes, N, N) array, inf for missing links.
+
+    Returns:
+    - (N, N) array of the best transport index and (N, N) array of its
+      value (inf where no transport links the pair).
+    """
+    tensor = np.asarray(tensor)
+    bestMode = tensor.argmin(axis=0)
+    bestCost = np.take_along_axis(tensor, bestMode[np.newaxis], axis=0)[0]
+    return bestMode, bestCost
+
+
+def nondominated_modes(costT, timeT):
+    """
+    (modes, N, N) mask of the transports worth considering on each leg:
+    those with a link that no other transport beats in both cost and time.
+    """
+    costT, timeT = np.asarray(costT), np.asarray(timeT)
+    mask = np.isfinite(costT) & np.isfinite(timeT)
+    for m in range(len(costT)):
+        for other in range(len(costT)):
+            if other != m:
+                dominated = (costT[other] <= costT[m]) & (timeT[other] <= timeT[m]) & \
+                            ((costT[other] < costT[m]) | (timeT[other] < timeT[m]))
+                mask[m] &= ~(dominated & mask[other])
+    return mask
+
+
+def _nondominated(costs, times):
+    # Indexes of the non-dominated (cost, time) pairs sorted by cost,
+    # keeping one of identical pairs
+    order = np.lexsort((times, costs))
+    sortedTimes = times[order]
+    best = np.minimum.accumulate(np.concatenate(([np.inf], sortedTimes[:-1])))
+    return order[sortedTimes < best]
+
+
+def pareto_assignments(costT, timeT, tour, maxsize=8, mask=None):
+    """
+    Non-dominated transport assignments of a fixed tour.
+
+    The legs are added one by one, combining the assignments kept so far
+    with the non-dominated transports of the leg and pruning the dominated
+    combinations. When more than maxsize remain, maxsize evenly spread along
+    the front (extremes included) are kept.
+
+    Parameters:
+    - costT, timeT: (modes, N, N) cost and time tensors.
+    - tour: Sequence of city indexes, leg i ends at tour[i].
+    - maxsize: Largest number of assignments kept.
+    - mask: nondominated_modes(costT, timeT), computed if not given.
+
+    Returns:
+    - Costs, times and (L, N) transport matrix of the L assignments sorted by
+      cost, or None if some leg has no link at all.
+    """
+    if mask is None:
+        mask = nondominated_modes(costT, timeT)
+    tour = np.asarray(tour)
+    prev = np.roll(tour, 1)
+
+    costs = np.zeros(1)
+    times = np.zeros(1)
+    modes = np.zeros((1, 0), dtype=int)
+    for i in range(len(tour)):
+        options = np.flatnonzero(mask[:, prev[i], tour[i]])
+        if options.size == 0:
+            return None
+        costs = (costs[:, np.newaxis] + costT[options, prev[i], tour[i]]).ravel()
+        times = (times[:, np.newaxis] + timeT[options, prev[i], tour[i]]).ravel()
+        modes = np.hstack((np.repeat(modes, len(options), axis=0),
+                           np.tile(options, len(modes))[:, np.newaxis]))
+
+        keep = _nondominated(costs, times)
+        if len(keep) > maxsize:
+            keep = keep[np.unique(np.linspace(0, len(keep) - 1, maxsize).round().astype(int))]
+        costs, times, modes = costs[keep], times[keep], modes[keep]
+
+    return costs, times, modes
@@ -0,0 +1,63 @@
+"""
+The three solvers as an importable engine.
+
+A problems.Problem holds the matrices of an instance and run solves it with
+one of the solvers, returning its results instead of printing, plotting or
+streaming them:
+
+    problem = problems.Problem.transport("datasets/time", cityN=30)
+    result = engine.run(problem, popN=100, seed=1, stop=termination.Termination(20000))
+    print(result["best"], result["individual"], result["stop"])
+
+Every run builds its own DEAP toolbox on the matrices of its problem, so
+runs of different solvers and instances can follow each other in one
+process. They cannot run on concurrent threads: the solvers and the DEAP
+operators draw from the global random module, which every run reseeds
+with its seed (from the system when seed is None), so the caller's random
+state is replaced too. Run concurrent experiments in separate processes,
+as experiments.py does. Importing the engine or the solvers reads no
+file and loads neither matplotlib (only the plots of evolutionaryMO.py and
+the telemetry viewer import it) nor pandas (only the preprocessing script of
+the datasets uses it).
+"""
+
+import evolutionary
+import evolutionaryMO
+import evolutionaryTransport
+
+SOLVERS = {
+    "tsp": evolutionary.solve,
+    "transport": evolutionaryTransport.solve,
+    "mo": evolutionaryMO.solve,
+}
+
+
+def solver_for(problem):
+    """Name of the solver of a problem: "mo" with a time tensor, "tsp" with a single transport, else "transport"."""
+    if problem.time is not None:
+        return "mo"
+    return "tsp" if problem.modeN == 1 else "transport"
+
+
+def run(problem, solver=None, **options):
+    """
+    Solve a problem.
+
+    Parameters:
+    - problem: problems.Problem.
+    - solver: "tsp", "transport" or "mo", solver_for(problem) if None.
+    - options: Keyword arguments of the solve function of the solver (popN,
+      CXPB, evalMode, cacheSize, seed, stop, ...). The global random
+      module is reseeded with seed.
+
+    Returns:
+    - dict of results: g, evaluations, cache_hits, stop and the final
+      population pop, with best and individual for the single objective
+      solvers and hv, hv_pareto, ref, the Pareto archive pareto and the
+      first front of the population front for "mo".
+    """
+    if solver is None:
+        solver = solver_for(problem)
+    if solver not in SOLVERS:
+        raise ValueError("unknown solver %r, not one of %s" % (solver, ", ".join(SOLVERS)))
+    return SOLVERS[solver](problem, **options)
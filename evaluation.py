@@ -0,0 +1,190 @@
+"""
+Evaluation helpers shared by the solvers.
+
+Tours are closed: leg i goes from tour[i-1] to tour[i] (leg 0 from the last
+city back to the first) and, in the transport genomes, modes[i] is the
+transport used on leg i. Every function works on a single tour (1-D) or on
+a batch of tours stacked as a (P, N) integer matrix.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def tour_cost(matrix, tours, modes=None):
+    """
+    Sum of the leg values of closed tours.
+
+    Parameters:
+    - matrix: (N, N) array, or (modes, N, N) array when modes is given.
+    - tours: (N,) or (P, N) integer array of city indexes.
+    - modes: Optional array shaped like tours with the transport of each leg.
+
+    Returns:
+    - A scalar, or a (P,) array for a batch. inf when any leg is missing.
+    """
+    prev = np.roll(tours, 1, axis=-1)
+    if modes is None:
+        return matrix[prev, tours].sum(axis=-1)
+    return matrix[modes, prev, tours].sum(axis=-1)
+
+
+def stack_tours(individuals):
+    """(P, N) integer matrix of the tours of permutation individuals."""
+    return np.array(individuals, dtype=np.intp)
+
+
+def stack_genomes(individuals):
+    """(P, N) tour and mode matrices of [tour, modes] individuals."""
+    tours = np.array([ind[0] for ind in individuals], dtype=np.intp)
+    modes = np.array([ind[1] for ind in individuals], dtype=np.intp)
+    return tours, modes
+
+
+def map_evaluate(evaluate, individuals):
+    """Evaluate individuals one at a time, the non batched evaluation mode."""
+    return list(map(evaluate, individuals))
+
+
+def delta_cost(matrices, tour, modes, record):
+    """
+    Update a fitness from the legs changed since it was computed.
+
+    Parameters:
+    - matrices: One matrix per objective, in the order of the fitness values.
+    - tour, modes: Current genome (modes is None for plain permutations).
+    - record: individual.delta as left by the variation operators, with the
+      previous fitness and the previous value of every changed position.
+
+    Returns:
+    - The new fitness tuple, or None when a full evaluation is needed.
+    """
+    n = len(tour)
+    oldCities = record["cities"]
+    oldModes = record["modes"]
+    legs = set(oldModes)
+    for p in oldCities:
+        legs.add(p)
+        legs.add((p + 1) % n)
+    if len(legs) >= n:
+        return None
+
+    fitness = []
+    for matrix, base in zip(matrices, record["base"]):
+        # inf - inf is undefined, infeasible tours are recomputed
+        if base == float("inf"):
+            return None
+        removed = added = 0.0
+        for leg in legs:
+            a, b = tour[leg - 1], tour[leg]
+            oldA, oldB = oldCities.get((leg - 1) % n, a), oldCities.get(leg, b)
+            if modes is None:
+                added += matrix[a, b]
+                removed += matrix[oldA, oldB]
+            else:
+                added += matrix[modes[leg], a, b]
+                removed += matrix[oldModes.get(leg, modes[leg]), oldA, oldB]
+        fitness.append(float(base - removed + added))
+    return tuple(fitness)
+
+
+def delta_evaluate(individuals, matrices, evaluateBatch, transport=False):
+    """
+    Evaluate individuals incrementally where they carry a delta record.
+
+    Individuals without a usable record (new from crossover, infeasible or
+    with too many changes) are evaluated together with evaluateBatch. Records
+    are consumed.
+    """
+    fitnesses = [None] * len(individuals)
+    full = []
+    for k, ind in enumerate(individuals):
+        record = getattr(ind, "delta", None)
+        ind.delta = None
+        if record is not None:
+            if transport:
+                fitnesses[k] = delta_cost(matrices, ind[0], ind[1], record)
+            else:
+                fitnesses[k] = delta_cost(matrices, ind, None, record)
+        if fitnesses[k] is None:
+            full.append(k)
+
+    for k, fit in zip(full, evaluateBatch([individuals[k] for k in full])):
+        fitnesses[k] = fit
+    return fitnesses
+
+
+def tour_key(individual):
+    """Cache key of a closed tour, the same for all its rotations."""
+    start = individual.index(min(individual))
+    return tuple(individual[start:]) + tuple(individual[:start])
+
+
+def genome_key(individual):
+    """Cache key of a [tour, modes] genome, rotating the modes with the tour."""
+    tour, modes = individual
+    if isinstance(tour, np.ndarray):
+        tour, modes = tour.tolist(), modes.tolist()
+    start = tour.index(min(tour))
+    return tuple(tour[start:]) + tuple(tour[:start]) + tuple(modes[start:]) + tuple(modes[:start])
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitnesses in front of a population evaluation.
+
+    Parameters:
+    - evaluatePop: Function evaluating a list of individuals, as
+      toolbox.evaluatePop.
+    - key: Function giving the canonical key of an individual (tour_key or
+      genome_key).
+    - maxsize: Number of fitnesses kept.
+
+    hits counts the individuals served from the cache (or repeated within a
+    batch) and misses those actually evaluated. Individuals served from the
+    cache lose their delta record, which is only consumed by an evaluation.
+    """
+
+    def __init__(self, evaluatePop, key, maxsize):
+        self.evaluatePop = evaluatePop
+        self.key = key
+        self.maxsize = maxsize
+        self.fitnesses = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, individuals):
+        keys = [self.key(ind) for ind in individuals]
+        pending = {}
+        for k, key in enumerate(keys):
+            if key in self.fitnesses:
+                self.fitnesses.move_to_end(key)
+            elif key not in pending:
+                pending[key] = k
+
+        self.hits += len(individuals) - len(pending)
+        self.misses += len(pending)
+        found = {key: self.fitnesses[key] for key in keys if key in self.fitnesses}
+        for k, ind in enumerate(individuals):
+            if pending.get(keys[k]) != k and getattr(ind, "delta", None) is not None:
+                ind.delta = None
+        for key, fit in zip(pending, self.evaluatePop([individuals[k] for k in pending.values()])):
+            found[key] = fit
+            self.fitnesses[key] = fit
+            if len(self.fitnesses) > self.maxsize:
+                self.fitnesses.popitem(last=False)
+
+        return [found[key] for key in keys]
+
+    def state(self):
+        """(K, L) int16 keys and (K, objectives) fitnesses in LRU order, hits and misses."""
+        keys = np.array(list(self.fitnesses), dtype=np.int16)
+        fitnesses = np.array(list(self.fitnesses.values()), dtype=float)
+        return keys, fitnesses, self.hits, self.misses
+
+    def restore(self, keys, fitnesses, hits, misses):
+        """Inverse of state, for a checkpointed run."""
+        self.fitnesses = OrderedDict((tuple(key), tuple(fit)) for key, fit in zip(keys.tolist(), fitnesses.tolist()))
+        self.hits = int(hits)
+        self.misses = int(misses)
@@ -18,79 +18,431 @@
 #    each of which can be 0 or 1
 
 import random
-import csv
-import getopt, sys
+import functools
+import getopt, sys, os, time
+import numpy as np
 
 from deap import base
-from deap import creator
 from deap import tools
 
-creator.create("FitnessMax", base.Fitness, weights=(-1.0,))
-creator.create("Individual", list, fitness=creator.FitnessMax)
+import problems
+import evaluation
+import variation
+import parallel
+import islands
+import localsearch
+import seeding
+import telemetry
+import profiling
+import checkpoint
+import termination
 
-toolbox = base.Toolbox()
+# individuals are lists of city indexes with a cost to minimize, plain classes
+#   (not made by deap.creator) so several solvers and runs share one process
+class FitnessMin(base.Fitness):
+    weights = (-1.0,)
 
-# Structure initializers
-#                         define 'individual' to be an individual
-#                         consisting of 50 indexes of cities shuffled around
-toolbox.register("individual", tools.initIterate, creator.Individual, lambda: random.sample(list(range(cityN)), cityN))
-
-# define the population to be a list of individuals
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+class Individual(list):
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self.fitness = FitnessMin()
 
 # the goal ('fitness') function to be maximized
-def evalCost(individual):
-    sumCost = 0.0
+#   costM[a, b] is the cost of going from city a to city b, inf when there is no link
+def evalCost(individual, costM):
+    return float(evaluation.tour_cost(costM, np.asarray(individual))),
 
-    for i in range(len(individual)):
-        try:
-            if i == 0:
-                sumCost += float(costM[individual[-1]][individual[i]])
+# same as evalCost for a whole list of individuals at once
+def evalCostBatch(individuals, costM):
+    if not individuals:
+        return []
+    costs = evaluation.tour_cost(costM, evaluation.stack_tours(individuals))
+    return [(c,) for c in costs.tolist()]
 
-            else:
-                sumCost += float(costM[individual[i-1]][individual[i]])
-        except:
-            return float('inf'),
-    return sumCost,
+# same as evalCostBatch, updating the fitness of mutants from their changed legs only
+def evalCostDelta(individuals, costM):
+    return evaluation.delta_evaluate(individuals, [costM], functools.partial(evalCostBatch, costM=costM))
+
+# memetic local search (2-opt and Or-opt) of an evaluated individual in place,
+#   stopped after about maxEvaluations evaluations (None for no limit),
+#   returns the number of evaluations its partial evaluations are worth
+def improveTour(individual, costM, neighbors, rows, maxEvaluations=None):
+    tour, cost, evaluations = localsearch.improve(individual, costM, neighbors, rows, maxEvaluations=maxEvaluations)
+    individual[:] = tour
+    individual.fitness.values = cost,
+    return evaluations
+
+# same as evalCostBatch with the batch split across the worker processes of pool
+def evalCostPool(individuals, pool):
+    if not individuals:
+        return []
+    costs, = pool(evaluation.stack_tours(individuals))
+    return [(c,) for c in costs.tolist()]
+
+# the operators of a run on the cost matrix costM, each run has its own toolbox
+def makeToolbox(costM):
+    cityN = len(costM)
+    toolbox = base.Toolbox()
+
+    # Structure initializers
+    #                         define 'individual' to be an individual
+    #                         consisting of 50 indexes of cities shuffled around
+    toolbox.register("individual", tools.initIterate, Individual, lambda: random.sample(list(range(cityN)), cityN))
+
+    # define the population to be a list of individuals
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    #----------
+    # Operator registration
+    #----------
+    # register the goal / fitness function
+    toolbox.register("evaluate", evalCost, costM=costM)
+    toolbox.register("evaluateBatch", evalCostBatch, costM=costM)
+
+    # register the crossover operator
+    toolbox.register("mate", tools.cxPartialyMatched)
+
+    # register a mutation operator with a probability to
+    # flip each attribute/gene of 0.05
+    toolbox.register("mutate", variation.mutShuffleIndexes, indpb=0.02)
+
+    # the crossover and the mutation over the whole offspring at once
+    toolbox.register("vary", variation.vary_batch, indpb=0.02)
+
+    # operator for selecting individuals for breeding the next
+    # generation: each individual of the current generation
+    # is replaced by the 'fittest' (best) of three individuals
+    # drawn randomly from the current generation.
+    toolbox.register("select", tools.selTournament, tournsize = 4)
+    return toolbox
 
 #----------
-# Operator registration
-#----------
-# register the goal / fitness function
-toolbox.register("evaluate", evalCost)
 
-# register the crossover operator
-toolbox.register("mate", tools.cxPartialyMatched)
+# initial population of popN individuals, a fraction seedRatio of them built by
+#   the construction heuristics of seeding.py and the others shuffled at random
+def initialPopulation(toolbox, costM, popN, seedRatio, coordinates=None):
+    seeds = seeding.seed_tours(int(round(seedRatio * popN)), costM, coordinates)
+    return [Individual(tour) for tour in seeds] + toolbox.population(n=popN - len(seeds))
+
+# one generation of the algorithm, returns the new population and the number of evaluations
+#   LSPB is the probability with which an offspring is improved by local search
+#   within the budget evaluations left (None for no limit),
+#   batch varies the offspring as one array (toolbox.vary)
+def generation(toolbox, profiler, pop, popN, CXPB, MUTPB, LSPB=0.0, batch=False, budget=None):
+    # Select the next generation individuals
+    with profiler.phase("select"):
+        pop = toolbox.select(pop, popN)
+        offspring = toolbox.select(pop, (2*popN) // 3 )
+    # Clone the selected individuals
+    with profiler.phase("clone"):
+        offspring = list(map(toolbox.clone, offspring))
+    profiler.count("clones", len(offspring))
+    
+    # Apply crossover and mutation on the offspring
+    if batch:
+        # the same operators on the whole offspring at once (see variation.py)
+        with profiler.phase("vary"):
+            toolbox.vary(offspring, CXPB, MUTPB)
+    else:
+        with profiler.phase("mate"):
+            for child1, child2 in zip(offspring[::2], offspring[1::2]):
+
+                # cross two individuals with probability CXPB
+                if random.random() < CXPB:
+                    toolbox.mate(child1, child2)
+
+                    # fitness values of the children
+                    # must be recalculated later
+                    del child1.fitness.values
+                    del child2.fitness.values
+
+        with profiler.phase("mutate"):
+            for mutant in offspring:
+
+                # mutate an individual with probability MUTPB
+                if random.random() < MUTPB:
+                    toolbox.mutate(mutant)
+                    del mutant.fitness.values
+
+    # Evaluate the individuals with an invalid fitness
+    with profiler.phase("evaluate"):
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        fitnesses = toolbox.evaluatePop(invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+    evaluations = len(invalid_ind)
+    profiler.count("evaluations", evaluations)
+    profiler.count("inf", sum(1 for fit in fitnesses if fit[0] == float('inf')))
+
+    # without local search toolbox.improve is not registered and nothing is drawn
+    if LSPB > 0:
+        with profiler.phase("improve"):
+            for ind in offspring:
+                # the local search stops where the evaluation budget does
+                left = None if budget is None else budget - evaluations
+                if random.random() < LSPB and (left is None or left > 0):
+                    evaluations += toolbox.improve(ind, maxEvaluations=left)
+
+    # The population is entirely replaced by the offspring
+    pop[popN//3:] = offspring
+
+    return pop, evaluations
+
+# registers toolbox.evaluatePop for evaluation mode evalMode (single, batch,
+#   delta or pool) behind a fitness cache of cacheSize (0 for none), returns
+#   the cache and the pool, None when they are not used
+def registerEvaluation(toolbox, costM, evalMode="batch", workers=None, cacheSize=0):
+    pool = None
+    if evalMode == "batch":
+        toolbox.register("evaluatePop", toolbox.evaluateBatch)
+    elif evalMode == "delta":
+        toolbox.register("evaluatePop", evalCostDelta, costM=costM)
+        # mutation operators keep what they change for the delta evaluation
+        toolbox.register("mutate", toolbox.mutate, record=True)
+        toolbox.register("vary", toolbox.vary, record=True)
+    elif evalMode == "pool":
+        pool = parallel.PoolEvaluator([costM], workers)
+        toolbox.register("evaluatePop", evalCostPool, pool=pool)
+    else:
+        toolbox.register("evaluatePop", evaluation.map_evaluate, toolbox.evaluate)
+
+    # cached fitnesses are not evaluated again and do not count against the budget
+    cache = None
+    if cacheSize > 0:
+        cache = evaluation.FitnessCache(toolbox.evaluatePop, evaluation.tour_key, cacheSize)
+        toolbox.register("evaluatePop", cache)
+    return cache, pool
+
+# runs one island of the island model on its own process (see islands.py)
+#   every interval generations the best migrants individuals are sent to the
+#   next island and those received replace the worst of the population,
+#   the evaluation budget is shared and the other stop criteria are the
+#   island's own, except the target which stops all the islands
+#   evalMode and cacheSize are those of registerEvaluation, without pool
+def runIsland(island, problem, popN, CXPB, MUTPB, LSPB, interval, migrants, seedRatio, coordinates, seed=None, batch=False, stop=None,
+              evalMode="batch", cacheSize=0):
+    costM = problem.cost[0]
+    toolbox = makeToolbox(costM)
+    cache, pool = registerEvaluation(toolbox, costM, evalMode, cacheSize=cacheSize)
+    if LSPB > 0:
+        toolbox.register("improve", improveTour, costM=costM, neighbors=localsearch.neighbor_lists(costM), rows=costM.tolist())
+    profiler = profiling.NullProfiler()
+
+    # a forked process starts with the same random state as its parent,
+    #   with --seed each island gets its own fixed seed
+    random.seed(None if seed is None else seed + island.index)
+
+    pop = initialPopulation(toolbox, costM, popN, seedRatio, coordinates)
+    for ind, fit in zip(pop, toolbox.evaluatePop(pop)):
+        ind.fitness.values = fit
+    e = len(pop) if cache is None else cache.misses
+    running = island.spend(e)
+
+    if stop is None:
+        stop = termination.Termination(None)
+    g = 0
+    while running and not stop.done(e, min(ind.fitness.values[0] for ind in pop)):
+        g = g + 1
+        hits = cache.hits if cache is not None else 0
+        # the islands search at the same time and only spend at the end of a
+        #   generation, so the local search of each keeps to its share of the budget
+        pop, evaluations = generation(toolbox, profiler, pop, popN, CXPB, MUTPB, LSPB, batch, min(island.left(), island.budget // island.K - e))
+        # cache hits were not evaluated
+        if cache is not None:
+            evaluations -= cache.hits - hits
+        e += evaluations
+        running = island.spend(evaluations)
+
+        if g % interval == 0:
+            island.emigrate(tools.selBest(pop, migrants))
+            arrived = island.immigrants()
+            if arrived:
+                pop.sort(key=lambda ind: ind.fitness, reverse=True)
+                for k, (genome, fit) in enumerate(arrived[:len(pop)]):
+                    pop[-1 - k] = Individual(genome)
+                    pop[-1 - k].fitness.values = fit
+
+    if stop.reason == "target":
+        island.stop()
+    best_ind = tools.selBest(pop, 1)[0]
+    island.report((list(best_ind), best_ind.fitness.values, e, g, stop.reason or "evaluations", None if cache is None else cache.hits))
+
+# solves a problem (problems.Problem, its first matrix is the cost) and returns
+#   the results as a dict: the best cost and tour, the generations and
+#   evaluations, the cache hits, the stop reason and the final population
+#   stop is a termination.Termination (10000 evaluations by default), progress
+#   goes to stream (telemetry.Telemetry) and to stdout with verbose, the phases
+#   to profiler (profiling.Profiler)
+def solve(problem, popN=100, CXPB=0.6, MUTPB=0.4, LSPB=0.0, evalMode="batch", workers=None, cacheSize=0, batch=False,
+          islandN=1, interval=10, topology="ring", seedRatio=0.0, coordinates=None, seed=None, stop=None,
+          stream=None, profiler=None, checkpointPath=None, checkpointEvery="10", resume=False, verbose=False):
+    random.seed(seed)
+    if stop is None:
+        stop = termination.Termination()
+    if profiler is None:
+        profiler = profiling.NullProfiler()
+
+    costM = problem.cost[0]
+    cityN = problem.cityN
+    toolbox = makeToolbox(costM)
 
-# register a mutation operator with a probability to
-# flip each attribute/gene of 0.05
-toolbox.register("mutate", tools.mutShuffleIndexes, indpb=0.02)
+    # LSPB is the probability of improving an offspring by local search
+    if LSPB > 0:
+        toolbox.register("improve", improveTour, costM=costM, neighbors=localsearch.neighbor_lists(costM), rows=costM.tolist())
 
-# operator for selecting individuals for breeding the next
-# generation: each individual of the current generation
-# is replaced by the 'fittest' (best) of three individuals
-# drawn randomly from the current generation.
-toolbox.register("select", tools.selTournament, tournsize = 4)
+    if islandN > 1:
+        # a pool per island would start islandN times the workers
+        if evalMode == "pool":
+            raise ValueError("evaluation mode pool is not supported with islands")
+        if checkpointPath is not None or resume or not isinstance(profiler, profiling.NullProfiler):
+            raise ValueError("checkpoints and profiles are not supported with islands")
+        if verbose:
+            print("Start of evolution on %i islands" % islandN)
+        if stream is not None:
+            stream.phase("evolve")
+        results = islands.run(islandN, runIsland, (problem, popN, CXPB, MUTPB, LSPB, interval, 2, seedRatio, coordinates, seed, batch,
+                                                   termination.Termination(None, stop.seconds, stop.target, stop.window, stop.tolerance),
+                                                   evalMode, cacheSize),
+                              budget=stop.evaluations, topology=topology)
+
+        # the stop reason is that of the best island
+        best_ind, best_fit, e, g, reason, hits = min(results, key=lambda result: result[1])
+        return {"g": max(result[3] for result in results), "evaluations": sum(result[2] for result in results),
+                "best": best_fit[0], "individual": best_ind, "stop": reason, "pop": None,
+                "cache_hits": None if cacheSize == 0 else sum(result[5] for result in results)}
+
+    cache, pool = registerEvaluation(toolbox, costM, evalMode, workers, cacheSize)
+
+    # the worker processes and shared memory of the pool are released even
+    # when the run fails
+    try:
+        if stream is not None:
+            stream.phase("init")
+
+        schedule = checkpoint.Schedule(checkpointEvery) if checkpointPath is not None else None
+        if resume and checkpointPath is not None and os.path.exists(checkpointPath):
+            # the population, counters, cache and random state of the last checkpoint
+            pop, e, g = checkpoint.load_run(checkpointPath, Individual, cache, termination=stop, cities=cityN, population=popN)
+            if verbose:
+                print("Resuming evolution at generation %i" % g)
+        else:
+            with profiler.phase("init"):
+                pop = initialPopulation(toolbox, costM, popN, seedRatio, coordinates)
+
+            if verbose:
+                print("Start of evolution")
+        
+            # Evaluate the entire population
+            e = 0
+            with profiler.phase("evaluate"):
+                fitnesses = toolbox.evaluatePop(pop)
+                for ind, fit in zip(pop, fitnesses):
+                    ind.fitness.values = fit
+                    e += 1
+            profiler.count("evaluations", len(pop))
+            if cache is not None:
+                e = cache.misses
+        
+            #print("  Evaluated %i individuals" % len(pop))
+            #print("  Evaluated %i total individuals" % e)
+
+            # Variable keeping track of the number of generations
+            g = 0
+
+        # Extracting all the fitnesses of 
+        fits = [ind.fitness.values[0] for ind in pop]
+
+        profiler.next_generation(g)
+        if stream is not None:
+            stream.generation(g, e, best=min(fits))
+            stream.phase("evolve")
+        # Begin the evolution
+        while not stop.done(e, min(fits)):
+            # A new generation
+            g = g + 1
+        #    print("-- Generation %i --" % g)
+        
+            hits = cache.hits if cache is not None else 0
+            pop, evaluations = generation(toolbox, profiler, pop, popN, CXPB, MUTPB, LSPB, batch,
+                                          None if stop.evaluations is None else stop.evaluations - e)
+            # cache hits were not evaluated
+            if cache is not None:
+                evaluations -= cache.hits - hits
+                profiler.count("cache hits", cache.hits - hits)
+            e += evaluations
+
+            with profiler.phase("report"):
+                # Gather all the fitnesses in one list and print the stats
+                fits = [ind.fitness.values[0] for ind in pop]
+            
+                length = len(pop)
+                mean = sum(fits) / length
+                sum2 = sum(x*x for x in fits)
+                std = abs(sum2 / length - mean**2)**0.5
+                if stream is not None:
+                    stream.generation(g, e, best=min(fits), mean=mean, std=std)
+            profiler.next_generation(g)
+
+            if schedule is not None and schedule.due(g):
+                checkpoint.save_run(checkpointPath, pop, e, g, cache, termination=stop, cities=cityN, population=popN)
+        
+         #  print("  Min %s" % min(fits))
+         #  print("  Max %s" % max(fits))
+         #  print("  Avg %s" % mean)
+         #  print("  Std %s" % std)
+    
+    finally:
+        if pool is not None:
+            pool.close()
+
+    best_ind = tools.selBest(pop, 1)[0]
+    return {"g": g, "evaluations": e, "best": best_ind.fitness.values[0], "individual": list(best_ind),
+            "cache_hits": None if cache is None else cache.hits, "stop": stop.reason, "pop": pop}
 
 #----------
 
 def main():
-    #random.seed(64)
+    start = time.perf_counter()
 
     # create an initial population of 300 individuals (where
     # each individual is a list of integers)
     argList = sys.argv[1:]
-    options = "hf:n:c:"
+    options = "hf:n:c:e:w:i:m:t:l:bp:r:x:o:"
+    LSPB = 0.0
+    cacheSize = 0
+    batchVariation = False
+    evalMode = "batch"
+    workers = None
+    islandN = 1
+    interval = 10
+    topology = "ring"
+    seedRatio = 0.0
+    xyName = "xy.csv"
+    seed = None
+    telemetryPath = None
+    profilePath = None
+    checkpointPath = None
+    checkpointEvery = "10"
+    resume = False
+    maxEvaluations = 10000
+    maxTime = None
+    target = None
+    stagnation = None
+    tolerance = 0.0
+    # CXPB  is the probability with which two individuals
+    #       are crossed
+    #
+    # MUTPB is the probability for mutating an individual
+    CXPB, MUTPB = 0.6, 0.4
     csvName = "timetrain.csv"
     popN = 100
-    global cityN
     cityN = 30
     try:
         
-        arguments, values = getopt.getopt(argList, options, "")
+        arguments, values = getopt.getopt(argList, options, ["seed=", "profile=", "checkpoint=", "checkpoint-every=", "resume", "max-evaluations=", "max-time=", "target=", "stagnation=", "tolerance=", "cxpb=", "mutpb="])
         for arg, value in arguments:
             if arg == "-h":
-                print("-f  .csv file with cities and costs Default: timetrain.csv\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30")
+                print("-f  .csv file with cities and costs Default: timetrain.csv\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30\n-e Evaluation mode, single, batch, delta or pool (not with -i) Default: batch\n-w Number of worker processes for -e pool Default: all cores\n-l Size of the fitness cache, 0 for none Default: 0\n-b Vary the offspring as one array, with vectorized crossover and mutation\n-i Number of islands, each on its own process Default: 1\n-m Generations between migrations Default: 10\n-t Migration topology, ring or random Default: ring\n-p Probability of improving an offspring with 2-opt/Or-opt local search Default: 0\n-r Fraction of the initial population built by construction heuristics Default: 0\n-x .csv file with the city coordinates for -r Default: xy.csv\n-o Headless run, progress is streamed as JSON lines to this file (- for stdout) Default: none\n--seed Seed of the random number generator, for reproducible runs Default: none\n--profile Time and count the phases of each generation, summary on stderr and per-generation trace saved to this .csv file (not with -i) Default: none\n--checkpoint Save the state of the run to this file (not with -i) Default: none\n--checkpoint-every Checkpoint every N generations, or every N seconds with Ns Default: 10\n--resume Continue from the --checkpoint file when it exists (not with -i)\n--max-evaluations Evaluation budget Default: 10000\n--max-time Wall-clock limit in seconds Default: none\n--target Stop once the best cost is at most this value Default: none\n--stagnation Stop after this many generations without improving the best cost Default: none\n--tolerance Smallest improvement for --stagnation, fraction of the best cost Default: 0\n--cxpb Probability of crossing each pair of offspring Default: 0.6\n--mutpb Probability of mutating the cities of each offspring Default: 0.4")
                 exit()
             elif arg == "-f":
                 csvName = value
@@ -98,110 +450,100 @@ def main():
                 popN = int(value)
             elif arg == "-c":
                 cityN = int(value)
+            elif arg == "-e":
+                evalMode = value
+            elif arg == "-w":
+                workers = int(value)
+            elif arg == "-l":
+                cacheSize = int(value)
+            elif arg == "-b":
+                batchVariation = True
+            elif arg == "-p":
+                LSPB = float(value)
+            elif arg == "-i":
+                islandN = int(value)
+            elif arg == "-m":
+                interval = int(value)
+            elif arg == "-t":
+                topology = value
+            elif arg == "-r":
+                seedRatio = float(value)
+            elif arg == "-x":
+                xyName = value
+            elif arg == "-o":
+                telemetryPath = value
+            elif arg == "--seed":
+                seed = int(value)
+            elif arg == "--profile":
+                profilePath = value
+            elif arg == "--checkpoint":
+                checkpointPath = value
+            elif arg == "--checkpoint-every":
+                checkpointEvery = value
+            elif arg == "--resume":
+                resume = True
+            elif arg == "--max-evaluations":
+                maxEvaluations = int(value)
+            elif arg == "--max-time":
+                maxTime = float(value)
+            elif arg == "--target":
+                target = float(value)
+            elif arg == "--stagnation":
+                stagnation = int(value)
+            elif arg == "--tolerance":
+                tolerance = float(value)
+            elif arg == "--cxpb":
+                CXPB = float(value)
+            elif arg == "--mutpb":
+                MUTPB = float(value)
         
     except getopt.error as err:
         print(str(err))
 
-    with open(csvName, "r") as fp:
-        reader = csv.reader(fp)
-        #Get first row
-        cities = next(reader)[1:cityN +1]
-        #Get Cost matrix
-        global costM 
-        costM = []
-        for i, row in enumerate(reader):
-            if i >= cityN:
-                break
-            else:
-                costM.append(row[1:cityN +1])
+    # the run stops at the first of its stop criteria (see termination.py)
+    stop = termination.Termination(maxEvaluations, maxTime, target, stagnation, tolerance)
 
+    profiler = profiling.NullProfiler()
+    if profilePath is not None:
+        profiler = profiling.Profiler("evolutionary")
 
-    pop = toolbox.population(n=popN)
+    # headless runs stream their progress (see telemetry.py) instead of printing it
+    stream = None
+    if telemetryPath is not None:
+        stream = telemetry.Telemetry(telemetryPath, start)
 
-    # CXPB  is the probability with which two individuals
-    #       are crossed
-    #
-    # MUTPB is the probability for mutating an individual
-    CXPB, MUTPB = 0.6, 0.4
-    
-    print("Start of evolution")
-    
-    # Evaluate the entire population
-    e = 0
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
-        e += 1
-    
-    #print("  Evaluated %i individuals" % len(pop))
-    #print("  Evaluated %i total individuals" % e)
+    if islandN > 1 and evalMode == "pool":
+        print("-e pool is not supported with -i, every island already runs on its own process")
+        exit(2)
+    # the islands are separate processes, they are neither profiled nor checkpointed
+    if islandN > 1 and (profilePath is not None or checkpointPath is not None or resume):
+        print("--profile, --checkpoint and --resume are not supported with -i")
+        exit(2)
 
-    # Extracting all the fitnesses of 
-    fits = [ind.fitness.values[0] for ind in pop]
+    problem = problems.Problem.tsp(csvName, cityN)
 
-    # Variable keeping track of the number of generations
-    g = 0
-    # Begin the evolution
-    while  e < 10000:
-        # A new generation
-        g = g + 1
-    #    print("-- Generation %i --" % g)
-        
-        # Select the next generation individuals
-        pop = toolbox.select(pop, popN)
-        offspring = toolbox.select(pop, (2*popN) // 3 )
-        # Clone the selected individuals
-        offspring = list(map(toolbox.clone, offspring))
-    
-        # Apply crossover and mutation on the offspring
-        for child1, child2 in zip(offspring[::2], offspring[1::2]):
+    # the space filling curve seed needs the coordinates of the cities
+    coordinates = None
+    if seedRatio > 0 and os.path.exists(xyName):
+        coordinates = seeding.read_coordinates(xyName, problem.cities)
 
-            # cross two individuals with probability CXPB
-            if random.random() < CXPB:
-                toolbox.mate(child1, child2)
+    result = solve(problem, popN, CXPB, MUTPB, LSPB, evalMode, workers, cacheSize, batchVariation, islandN, interval, topology,
+                   seedRatio, coordinates, seed, stop, stream, profiler, checkpointPath, checkpointEvery, resume, verbose=stream is None)
 
-                # fitness values of the children
-                # must be recalculated later
-                del child1.fitness.values
-                del child2.fitness.values
+    if profilePath is not None:
+        profiler.report()
+        profiler.write(profilePath)
 
-        for mutant in offspring:
+    if stream is not None:
+        stream.close(g=result["g"], evaluations=result["evaluations"], best=result["best"], individual=result["individual"],
+                     cache_hits=result["cache_hits"], stop=result["stop"])
+        return
 
-            # mutate an individual with probability MUTPB
-            if random.random() < MUTPB:
-                toolbox.mutate(mutant)
-                del mutant.fitness.values
-    
-        # Evaluate the individuals with an invalid fitness
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            e += 1
-            ind.fitness.values = fit
-
-        #print("  Evaluated %i individuals" % len(invalid_ind))
-        #print("  Evaluated %i total individuals" % e)
-        
-        # The population is entirely replaced by the offspring
-        pop[popN//3:] = offspring
-        
-        # Gather all the fitnesses in one list and print the stats
-        fits = [ind.fitness.values[0] for ind in pop]
-        
-        length = len(pop)
-        mean = sum(fits) / length
-        sum2 = sum(x*x for x in fits)
-        std = abs(sum2 / length - mean**2)**0.5
-        
-     #  print("  Min %s" % min(fits))
-     #  print("  Max %s" % max(fits))
-     #  print("  Avg %s" % mean)
-     #  print("  Std %s" % std)
-    
     print("-- End of (successful) evolution --")
-    
-    best_ind = tools.selBest(pop, 1)[0]
-    print("Best individual is %s, %s" % ([cities[i] for i in best_ind], best_ind.fitness.values))
+    print("Stopped by %s" % result["stop"])
+    if result["cache_hits"] is not None:
+        print("Evaluations %i, cache hits %i" % (result["evaluations"], result["cache_hits"]))
+    print("Best individual is %s, %s" % ([problem.cities[i] for i in result["individual"]], (result["best"],)))
 
 
 if __name__ == "__main__":
@@ -18,47 +18,118 @@
 #    each of which can be 0 or 1
 
 import random
-import csv
-import getopt, sys
+import functools
+import getopt, sys, os, time
 import numpy as np
 
-import matplotlib.pyplot as plt
-
 from deap import base
-from deap import creator
 from deap import tools
 
-creator.create("FitnessMin", base.Fitness, weights=(-1.0, -1.0))
-creator.create("Individual", list, fitness=creator.FitnessMin)
-
-toolbox = base.Toolbox()
-
-# Structure initializers
-#                         define 'individual' to be an individual
-#                         consisting of 50 indexes of cities shuffled around and an index of the transport to use
-toolbox.register("individual", tools.initIterate, creator.Individual, lambda: [random.sample(list(range(cityN)), cityN), [random.randint(0,2) for i in range(cityN)]])
-
-# define the population to be a list of individuals
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+import matrices
+import problems
+import evaluation
+import variation
+import parallel
+import moea
+import telemetry
+import profiling
+import checkpoint
+import termination
+import genome
+import decoders
+import seeding
+import connections
+
+# individuals are [tour, modes] genomes held in two small arrays (see genome.py)
+#   with a cost and a time to minimize, plain classes (not made by deap.creator)
+#   so several solvers and runs share one process
+class FitnessMin(base.Fitness):
+    weights = (-1.0, -1.0)
+
+class Individual(genome.Genome):
+    __slots__ = ()
+
+    def __init__(self, genome=((), ())):
+        super().__init__(genome)
+        self.fitness = FitnessMin()
 
 # the goal ('fitness') function to be maximized
-def evalCost(individual):
-    sumCost = 0.0
-    sumTime = 0.0
-
-    for i in range(len(individual[0])):
-        try:
-            if i == 0:
-                sumCost += float(costM[individual[1][i]][individual[0][-1]][individual[0][i]])
-                sumTime += float(timeM[individual[1][i]][individual[0][-1]][individual[0][i]])
-
-            else:
-                sumCost += float(costM[individual[1][i]][individual[0][i-1]][individual[0][i]])
-                sumTime += float(timeM[individual[1][i]][individual[0][i-1]][individual[0][i]])
-        except:
-            return float('inf'), float('inf')
-
-    return sumCost, sumTime
+#   costM[m, a, b] / timeM[m, a, b] are the cost / time of going from city a to city b with transport m, inf when there is no link
+#   individual[1][i] is the transport used to arrive at individual[0][i]
+def evalCost(individual, costM, timeM):
+    tour = np.asarray(individual[0])
+    modes = np.asarray(individual[1])
+    return float(evaluation.tour_cost(costM, tour, modes)), float(evaluation.tour_cost(timeM, tour, modes))
+
+# same as evalCost for a whole list of individuals at once
+def evalCostBatch(individuals, costM, timeM):
+    if not individuals:
+        return []
+    tours, modes = evaluation.stack_genomes(individuals)
+    costs = evaluation.tour_cost(costM, tours, modes)
+    times = evaluation.tour_cost(timeM, tours, modes)
+    return list(zip(costs.tolist(), times.tolist()))
+
+# same as evalCostBatch, updating the fitness of mutants from their changed legs only
+def evalCostDelta(individuals, costM, timeM):
+    return evaluation.delta_evaluate(individuals, [costM, timeM], functools.partial(evalCostBatch, costM=costM, timeM=timeM), transport=True)
+
+# same as evalCostBatch with the batch split across the worker processes of pool
+def evalCostPool(individuals, pool):
+    if not individuals:
+        return []
+    costs, times = pool(*evaluation.stack_genomes(individuals))
+    return list(zip(costs.tolist(), times.tolist()))
+
+# the transports of each tour are decoded instead of evaluated as they are:
+#   the individual takes the non-dominated assignment of its tour closest to its
+#   transport genes, the other assignments are left in ind.alternatives for the archive
+def evalCostDecoded(individuals, costM, timeM, maxsize, mask):
+    fitnesses = []
+    for ind in individuals:
+        decoded = decoders.pareto_assignments(costM, timeM, ind[0], maxsize, mask)
+        if decoded is None:
+            ind.alternatives = []
+            fitnesses.append((float('inf'), float('inf')))
+            continue
+        costs, times, modes = decoded
+        k = int(np.argmax((modes == np.asarray(ind[1])).sum(axis=1)))
+        ind[1][:] = modes[k]
+        ind.alternatives = [(modes[j].tolist(), (costs[j], times[j])) for j in range(len(costs)) if j != k]
+        fitnesses.append((costs[k], times[k]))
+    return fitnesses
+
+# every decoded assignment left by evalCostDecoded is a candidate for the archive
+def archiveAlternatives(pareto, individuals):
+    for ind in individuals:
+        for modes, fit in ind.alternatives:
+            alternative = Individual([ind[0], modes])
+            alternative.fitness.values = fit
+            pareto.insert(alternative)
+        ind.alternatives = []
+
+# initial population of popN individuals, a fraction seedRatio of them built by
+#   the construction heuristics of seeding.py and the others at random; half
+#   the seeds follow the cheapest transport of every leg and half the fastest,
+#   for both ends of the front
+def initialPopulation(toolbox, costM, timeM, popN, seedRatio, coordinates=None):
+    seedN = int(round(seedRatio * popN))
+    pop = []
+    for tensor, count in ((costM, (seedN + 1) // 2), (timeM, seedN // 2)):
+        bestMode, bestValue = decoders.best_modes(tensor)
+        for tour in seeding.seed_tours(count, bestValue, coordinates):
+            pop.append(Individual([tour, bestMode[np.roll(tour, 1), tour].tolist()]))
+    return pop + toolbox.population(n=popN - len(pop))
+# names of the legs of an individual, the layover connections (transports
+#   past the real ones, see connections.py) expanded into their hops
+def legNames(individual, cities, paths=None):
+    names = []
+    for a, b, mode in zip(np.roll(individual[0], 1).tolist(), individual[0], individual[1]):
+        if mode < len(matrices.MODES):
+            names.append(cities[b] + "-" + matrices.MODES[mode])
+        else:
+            names.append(">".join(cities[city] + "-" + matrices.MODES[m] for city, m in connections.expand(paths, mode - len(matrices.MODES), a, b)))
+    return names
 
 def calculate_hypervolume(pareto_front, max_values):
     """
@@ -66,75 +137,354 @@ def calculate_hypervolume(pareto_front, max_values):
 
     Parameters:
     - pareto_front: A list or array of points on the Pareto front (each point should be a tuple of two values).
-    - max_values: A tuple containing the maximum values for the two functions to be minimized.
+    - max_values: A tuple containing the maximum values for the two functions to be minimized (the reference point).
 
     Returns:
     - Hypervolume value.
     """
-    # Ensure pareto_front is a numpy array for easier manipulation
-    pareto_front = np.array(pareto_front)
-
-    # Initialize hypervolume
-    hypervolume = 0.0
-
-    # Sort Pareto front points based on the first objective (minimization)
-    sorted_front = pareto_front[np.argsort(pareto_front[:, 0])]
-
-    # Compute the hypervolume using the "step" method
-    previous_x = 0
-    for point in sorted_front:
-        x, y = point
-        # Calculate width and height of the rectangle
-        width = x - previous_x
-        height = max_values[1] - y
-        
-        # Update hypervolume
-        hypervolume += width * height
-        
-        # Update previous_x to current x
-        previous_x = x
-
-    return hypervolume
+    return moea.hypervolume(pareto_front, max_values)
+
+# first front of the population, for the hypervolume and the plots
+def firstFront(pop):
+    return tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
+
+# the operators of a run on the cost and time tensors costM and timeM, each run
+#   has its own toolbox
+def makeToolbox(costM, timeM):
+    modeN, cityN = len(costM), len(costM[0])
+    toolbox = base.Toolbox()
+
+    # Structure initializers
+    #                         define 'individual' to be an individual
+    #                         consisting of 50 indexes of cities shuffled around and an index of the transport to use
+    toolbox.register("individual", tools.initIterate, Individual, lambda: [random.sample(list(range(cityN)), cityN), [random.randint(0,modeN-1) for i in range(cityN)]])
+
+    # define the population to be a list of individuals
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    #----------
+    # Operator registration
+    #----------
+    # register the goal / fitness function
+    toolbox.register("evaluate", evalCost, costM=costM, timeM=timeM)
+    toolbox.register("evaluateBatch", evalCostBatch, costM=costM, timeM=timeM)
+
+    # register the crossover operator
+    toolbox.register("mate", tools.cxPartialyMatched)
+
+    # register a mutation operator with a probability to
+    # flip each attribute/gene of 0.05
+    toolbox.register("mutateCities", variation.mutShuffleIndexes, indpb=0.05, gene=0)
+    toolbox.register("mutateTransport", variation.mutUniformInt, indpb=0.05, low=0, up=modeN-1, gene=1)
+
+    # the crossover and both mutations over the whole offspring at once
+    toolbox.register("vary", variation.vary_batch, indpb=0.05, transport=True, transportIndpb=0.05, low=0, up=modeN-1)
+
+    # operator for selecting individuals for breeding the next
+    # generation: each individual of the current generation
+    # is replaced by the 'fittest' (best) of three individuals
+    # drawn randomly from the current generation.
+    toolbox.register("select", tools.selNSGA2)
+    toolbox.register("selectParents", tools.selNSGA2)
+
+    toolbox.register("front", firstFront)
+    return toolbox
 
 #----------
-# Operator registration
-#----------
-# register the goal / fitness function
-toolbox.register("evaluate", evalCost)
 
-# register the crossover operator
-toolbox.register("mate", tools.cxPartialyMatched)
+#  Plot the Pareto archive and the first front of the population, matplotlib
+#    is only imported by the runs that plot
+def plot_pareto_front(pareto_front, non_dominated, keep=False):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(8, 6))
+    front = pareto_front.points()
+    plt.scatter(front[:, 0], front[:, 1],
+                c='blue', label='Pareto Front')
+    plt.scatter([ind.fitness.values[0] for ind in non_dominated],
+                [ind.fitness.values[1] for ind in non_dominated],
+                c='red', label='Current pop Pareto Front')
+    plt.title('Pareto Front')
+    plt.xlabel('Cost (f1)')
+    plt.ylabel('Time (f2)')
+    plt.legend()
+    plt.grid()
+    plt.show(block=False)
+    plt.pause(1)
+    if not keep:
+        plt.close('all')
+
+# solves a problem (problems.Problem with a time tensor) and returns the
+#   results as a dict: the Pareto archive, the first front of the final
+#   population and their hypervolumes with their reference point, the
+#   generations and evaluations, the cache hits, the stop reason and the
+#   final population
+#   stop is a termination.Termination (10000 evaluations by default), progress
+#   goes to stream (telemetry.Telemetry), to stdout with verbose and to a plot
+#   every 10 generations with plot, the phases to profiler (profiling.Profiler)
+def solve(problem, popN=100, CXPB=0.5, MUTPB1=0.2, MUTPB2=0.2, selMode="nsga2", decoderSize=0, archiveSize=None, epsilon=None,
+          evalMode="batch", workers=None, cacheSize=0, batch=False, seedRatio=0.0, coordinates=None, seed=None, stop=None,
+          stream=None, profiler=None, checkpointPath=None, checkpointEvery="10", resume=False, verbose=False, plot=False):
+    random.seed(seed)
+    if stop is None:
+        stop = termination.Termination(maximize=True)
+    if profiler is None:
+        profiler = profiling.NullProfiler()
+
+    costM, timeM = problem.cost, problem.time
+    cityN = problem.cityN
+    limits = problem.ref
+    # the layover connections of the problem are the transports past the real ones
+    connectionN = 0 if problem.paths is None else len(problem.paths)
+    toolbox = makeToolbox(costM, timeM)
+
+    pool = None
+    if decoderSize > 0:
+        toolbox.register("evaluatePop", evalCostDecoded, costM=costM, timeM=timeM, maxsize=decoderSize, mask=decoders.nondominated_modes(costM, timeM))
+    elif evalMode == "batch":
+        toolbox.register("evaluatePop", toolbox.evaluateBatch)
+    elif evalMode == "delta":
+        toolbox.register("evaluatePop", evalCostDelta, costM=costM, timeM=timeM)
+        # mutation operators keep what they change for the delta evaluation
+        toolbox.register("mutateCities", toolbox.mutateCities, record=True)
+        toolbox.register("mutateTransport", toolbox.mutateTransport, record=True)
+        toolbox.register("vary", toolbox.vary, record=True)
+    elif evalMode == "pool":
+        pool = parallel.PoolEvaluator([costM, timeM], workers)
+        toolbox.register("evaluatePop", evalCostPool, pool=pool)
+    else:
+        toolbox.register("evaluatePop", evaluation.map_evaluate, toolbox.evaluate)
+
+    # the worker processes and shared memory of the pool are released even
+    # when the run fails
+    try:
+        # cached fitnesses are not evaluated again and do not count against the budget
+        cache = None
+        if cacheSize > 0 and decoderSize == 0:
+            cache = evaluation.FitnessCache(toolbox.evaluatePop, evaluation.genome_key, cacheSize)
+            toolbox.register("evaluatePop", cache)
+
+        if selMode == "crowded":
+            #toolbox.front ranks the population once per generation, select
+            #and selectParents reuse the ranks and crowding distances it stored
+            toolbox.register("front", moea.assign_ranks)
+            toolbox.register("select", moea.selRanked)
+            toolbox.register("selectParents", moea.selCrowdedTournament)
+
+        #Non-dominated sorts (selNSGA2 and the fronts) are counted, the final
+        #front after the last generation is not; selRanked and
+        #selCrowdedTournament reuse the ranks of the front and sort nothing
+        toolbox.register("finalFront", toolbox.front)
+        toolbox.register("front", profiler.counted("sorts", toolbox.front))
+        if selMode != "crowded":
+            toolbox.register("select", profiler.counted("sorts", toolbox.select))
+            toolbox.register("selectParents", profiler.counted("sorts", toolbox.selectParents))
+
+        #Create ParetoFront
+        #   its hypervolume is kept up to date as individuals enter and leave it
+        pareto = moea.ParetoArchive(ref=limits, epsilon=epsilon, maxsize=archiveSize)
+
+        if stream is not None:
+            stream.phase("init")
+
+        schedule = checkpoint.Schedule(checkpointEvery) if checkpointPath is not None else None
+        if resume and checkpointPath is not None and os.path.exists(checkpointPath):
+            #A populacao, contadores, cache, arquivo e estado aleatorio do ultimo checkpoint
+            pop, e, g = checkpoint.load_run(checkpointPath, Individual, cache, pareto, stop, cities=cityN, population=popN,
+                                            decoder=decoderSize, connections=connectionN)
+            if verbose:
+                print("Resuming evolution at generation %i" % g)
+        else:
+            with profiler.phase("init"):
+                pop = initialPopulation(toolbox, costM, timeM, popN, seedRatio, coordinates)
+        
+            if verbose:
+                print("Start of evolution")
+        
+            # Evaluate the entire population
+            e = 0
+            with profiler.phase("evaluate"):
+                fitnesses = toolbox.evaluatePop(pop)
+                for ind, fit in zip(pop, fitnesses):
+                    ind.fitness.values = fit
+                    e += 1
+            profiler.count("evaluations", len(pop))
+            if cache is not None:
+                e = cache.misses
+
+
+            # Variable keeping track of the number of generations
+            g = 0
+
+            #update the ParetoFront with population
+            pareto.update(pop)
+            if decoderSize > 0:
+                archiveAlternatives(pareto, pop)
 
-# register a mutation operator with a probability to
-# flip each attribute/gene of 0.05
-toolbox.register("mutateCities", tools.mutShuffleIndexes, indpb=0.05)
-toolbox.register("mutateTransport", tools.mutUniformInt, indpb=0.05, low=0, up=2)
+        # Calculate hypervolume for the current generation
+        non_dominated = toolbox.front(pop)
+        if plot:
+            # Plot initial Pareto front
+            plot_pareto_front(pareto, non_dominated)
+        if stream is not None:
+            stream.generation(g, e, hv=calculate_hypervolume([ind.fitness.values for ind in non_dominated], limits),
+                              hv_pareto=pareto.hypervolume, front=len(non_dominated), archive=len(pareto))
+            stream.front(g, [ind.fitness.values for ind in non_dominated], pareto.points())
+            stream.phase("evolve")
+
+        profiler.next_generation(g)
+
+        # Begin the evolution
+        while not stop.done(e, pareto.hypervolume):
+            # A new generation
+            g = g + 1
+            if verbose:
+                print("-- Generation %i --" % g)
+        
+            # Select the next generation individuals
+            with profiler.phase("select"):
+                pop = toolbox.select(pop, popN )
+                offspring = toolbox.selectParents(pop, popN // 2 )
+
+            # Clone the selected individuals
+            with profiler.phase("clone"):
+                offspring = list(map(toolbox.clone, offspring))
+            profiler.count("clones", len(offspring))
+    
+            # Apply crossover and mutation on the offspring
+            if batch:
+                # the same operators on the whole offspring at once (see variation.py)
+                with profiler.phase("vary"):
+                    toolbox.vary(offspring, CXPB, MUTPB1, transportpb=MUTPB2)
+            else:
+                with profiler.phase("mate"):
+                    for child1, child2 in zip(offspring[::2], offspring[1::2]):
+
+                        # cross two individuals with probability CXPB
+                        if random.random() < CXPB:
+                            toolbox.mate(child1[0], child2[0])
+
+                            # fitness values of the children
+                            # must be recalculated later
+                            del child1.fitness.values
+                            del child2.fitness.values
+
+                with profiler.phase("mutate"):
+                    for mutant in offspring:
+
+                        # mutate an individual with probability MUTPB
+                        if random.random() < MUTPB1:
+                            toolbox.mutateCities(mutant)
+                            del mutant.fitness.values
+
+                        # mutate an individual with probability MUTPB
+                        if random.random() < MUTPB2:
+                            toolbox.mutateTransport(mutant)
+                            del mutant.fitness.values
+    
+    
+            # Evaluate the individuals with an invalid fitness
+            with profiler.phase("evaluate"):
+                invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+                hits = cache.hits if cache is not None else 0
+                fitnesses = toolbox.evaluatePop(invalid_ind)
+                for ind, fit in zip(invalid_ind, fitnesses):
+                    e += 1
+                    ind.fitness.values = fit
+            profiler.count("evaluations", len(invalid_ind))
+            profiler.count("inf", sum(1 for fit in fitnesses if float('inf') in fit))
+            if cache is not None:
+                e = cache.misses
+                profiler.count("cache hits", cache.hits - hits)
+
+            #print("  Evaluated %i individuals" % len(invalid_ind))
+            #print("  Evaluated %i total individuals" % e)
+        
+            # The population is entirely replaced by the offspring
+            pop[popN//2:] = offspring
+        
+            #pareto front
+            with profiler.phase("archive"):
+                pareto.update(invalid_ind)
+                if decoderSize > 0:
+                    archiveAlternatives(pareto, invalid_ind)
+        
+            # Calculate hypervolume for the current generation
+            with profiler.phase("front"):
+                non_dominated = toolbox.front(pop)
+                hv = calculate_hypervolume([ind.fitness.values for ind in non_dominated], limits)
+                hv_pareto = pareto.hypervolume
+            with profiler.phase("report"):
+                if stream is not None:
+                    stream.generation(g, e, hv=hv, hv_pareto=hv_pareto, front=len(non_dominated), archive=len(pareto))
+                    if g%10 == 0:
+                        stream.front(g, [ind.fitness.values for ind in non_dominated], pareto.points())
+                if plot and g%10 == 0:
+                    # Plot initial Pareto front
+                    plot_pareto_front(pareto, non_dominated)
+                if verbose:
+                    print(f"Generation {g + 1}: Hypervolume = {hv}")
+                    print(f"Generation {g + 1}: Hypervolume Hall of Fame= {hv_pareto}")
+            profiler.next_generation(g)
+
+            if schedule is not None and schedule.due(g):
+                checkpoint.save_run(checkpointPath, pop, e, g, cache, pareto, stop, cities=cityN, population=popN,
+                                    decoder=decoderSize, connections=connectionN)
+    finally:
+        if pool is not None:
+            pool.close()
 
-# operator for selecting individuals for breeding the next
-# generation: each individual of the current generation
-# is replaced by the 'fittest' (best) of three individuals
-# drawn randomly from the current generation.
-toolbox.register("select", tools.selNSGA2)
+    # Calculate hypervolume for the current generation
+    non_dominated = toolbox.finalFront(pop)
+    hv = calculate_hypervolume([ind.fitness.values for ind in non_dominated], limits)
+    return {"g": g, "evaluations": e, "hv": hv, "hv_pareto": pareto.hypervolume, "ref": limits,
+            "cache_hits": None if cache is None else cache.hits, "stop": stop.reason,
+            "pareto": pareto, "front": non_dominated, "pop": pop}
 
 #----------
 
 def main():
-    #random.seed(64)
+    start = time.perf_counter()
 
     argList = sys.argv[1:]
-    options = "hf:n:c:"
+    options = "hf:n:c:e:w:l:ba:g:s:o:vd:r:x:k:"
+    decoderSize = 0
+    telemetryPath = None
+    viewer = False
+    selMode = "nsga2"
+    archiveSize = None
+    epsilon = None
+    cacheSize = 0
+    batchVariation = False
+    evalMode = "batch"
+    workers = None
     csvOpt = ""
+    seedRatio = 0.0
+    xyName = None
+    connectionN = 0
+    seed = None
+    profilePath = None
+    checkpointPath = None
+    checkpointEvery = "10"
+    resume = False
+    maxEvaluations = 10000
+    maxTime = None
+    target = None
+    stagnation = None
+    tolerance = 0.0
+    # CXPB  is the probability with which two individuals
+    #       are crossed
+    #
+    # MUTPB is the probability for mutating an individual
+    CXPB, MUTPB1, MUTPB2 = 0.5, 0.2, 0.2
     popN = 100
-    global cityN
     cityN = 30
-    limits = [0.0, 0.0]
 
     #Gestão de argumentos de entrada
     try:
-        arguments, values = getopt.getopt(argList, options, "")
+        arguments, values = getopt.getopt(argList, options, ["seed=", "profile=", "checkpoint=", "checkpoint-every=", "resume", "max-evaluations=", "max-time=", "target=", "stagnation=", "tolerance=", "cxpb=", "mutpb=", "mutpb-transport="])
         for arg, value in arguments:
             if arg == "-h":
-                print("-f  Base dir for dataset Default: .\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30")
+                print("-f  Base dir for dataset Default: .\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30\n-e Evaluation mode, single, batch, delta or pool Default: batch\n-w Number of worker processes for -e pool Default: all cores\n-l Size of the fitness cache, 0 for none Default: 0\n-b Vary the offspring as one array, with vectorized crossover and mutation\n-a Maximum size of the Pareto archive, 0 for none Default: 0\n-g Epsilon grid of the Pareto archive as cost,time Default: none\n-s Selection, nsga2 or crowded (one non-dominated sort per generation) Default: nsga2\n-o Headless run, progress is streamed as JSON lines to this file (- for stdout) Default: plots\n-v With -o, follow the progress in a separate viewer process\n-d Decode the transports of each tour into up to this many non-dominated assignments, 0 for none (ignores -e and -l) Default: 0\n-r Fraction of the initial population built by construction heuristics Default: 0\n-x .csv file with the city coordinates for -r Default: xy.csv in the dataset dir\n-k Number of non-dominated layover connections per pair of cities used as extra transports, 0 for none Default: 0\n--seed Seed of the random number generator, for reproducible runs Default: none\n--profile Time and count the phases of each generation, summary on stderr and per-generation trace saved to this .csv file Default: none\n--checkpoint Save the state of the run to this file Default: none\n--checkpoint-every Checkpoint every N generations, or every N seconds with Ns Default: 10\n--resume Continue from the --checkpoint file when it exists\n--max-evaluations Evaluation budget Default: 10000\n--max-time Wall-clock limit in seconds Default: none\n--target Stop once the hypervolume of the archive is at least this value Default: none\n--stagnation Stop after this many generations without improving the hypervolume of the archive Default: none\n--tolerance Smallest improvement for --stagnation, fraction of the hypervolume Default: 0\n--cxpb Probability of crossing each pair of offspring Default: 0.5\n--mutpb Probability of mutating the cities of each offspring Default: 0.2\n--mutpb-transport Probability of mutating the transports of each offspring Default: 0.2")
                 exit()
             elif arg == "-f":
                 csvOpt = value
@@ -142,186 +492,121 @@ def main():
                 popN = int(value)
             elif arg == "-c":
                 cityN = int(value)
+            elif arg == "-e":
+                evalMode = value
+            elif arg == "-w":
+                workers = int(value)
+            elif arg == "-l":
+                cacheSize = int(value)
+            elif arg == "-b":
+                batchVariation = True
+            elif arg == "-a":
+                archiveSize = int(value) or None
+            elif arg == "-g":
+                epsilon = tuple(float(v) for v in value.split(","))
+            elif arg == "-s":
+                selMode = value
+            elif arg == "-o":
+                telemetryPath = value
+            elif arg == "-v":
+                viewer = True
+            elif arg == "-d":
+                decoderSize = int(value)
+            elif arg == "-r":
+                seedRatio = float(value)
+            elif arg == "-x":
+                xyName = value
+            elif arg == "-k":
+                connectionN = int(value)
+            elif arg == "--seed":
+                seed = int(value)
+            elif arg == "--profile":
+                profilePath = value
+            elif arg == "--checkpoint":
+                checkpointPath = value
+            elif arg == "--checkpoint-every":
+                checkpointEvery = value
+            elif arg == "--resume":
+                resume = True
+            elif arg == "--max-evaluations":
+                maxEvaluations = int(value)
+            elif arg == "--max-time":
+                maxTime = float(value)
+            elif arg == "--target":
+                target = float(value)
+            elif arg == "--stagnation":
+                stagnation = int(value)
+            elif arg == "--tolerance":
+                tolerance = float(value)
+            elif arg == "--cxpb":
+                CXPB = float(value)
+            elif arg == "--mutpb":
+                MUTPB1 = float(value)
+            elif arg == "--mutpb-transport":
+                MUTPB2 = float(value)
         
     except getopt.error as err:
         print(str(err))
 
-    #Matris de custo
-    #   Lista de 3 matrizes cityN*cityN correspondentes aos ficheiros costtrain.csv, costplane.csv e costbus.csv
-    global costM 
-    costM = [[], [], []]
-    for i, j in enumerate(["costtrain.csv", "costplane.csv", "costbus.csv"]):
-        csvName =  csvOpt + j
-        with open(csvName, "r") as fp:
-            reader = csv.reader(fp)
-            #Get first row
-            cities = next(reader)[1:cityN +1]
-            #Get Cost matrix
-            for k, row in enumerate(reader):
-                if k >= cityN:
-                    break
-                else:
-                    costM[i].append(row[1:cityN +1])
-                    for l in row[1:cityN+1]:
-                        try:
-                            limits[0] = max(float(l), limits[0])
-                        except: continue
-    
-    #Igual ao de cima mas para tempo
-    global timeM 
-    timeM = [[], [], []]
-    for i, j in enumerate(["timetrain.csv", "timeplane.csv", "timebus.csv"]):
-        csvName =  csvOpt + j
-        with open(csvName, "r") as fp:
-            reader = csv.reader(fp)
-            #Get first row
-            cities = next(reader)[1:cityN +1]
-            #Get Cost matrix
-            for k, row in enumerate(reader):
-                if k >= cityN:
-                    break
-                else:
-                    timeM[i].append(row[1:cityN +1])
-                    for l in row[1:cityN+1]:
-                        try:
-                            limits[1] = max(float(l), limits[1])
-                        except: continue
-    
-    #Limits para calculo de Hypervolume
-    limits[0] = limits[0]*cityN
-    limits[1] = limits[1]*cityN
-    print(limits)
-
-    pop = toolbox.population(n=popN)
+    # the run stops at the first of its stop criteria (see termination.py)
+    stop = termination.Termination(maxEvaluations, maxTime, target, stagnation, tolerance, maximize=True)
+
+    #Tempos e contadores das fases de cada geracao
+    profiler = profiling.NullProfiler()
+    if profilePath is not None:
+        profiler = profiling.Profiler("evolutionaryMO")
+
+    #Matrizes de custo e de tempo
+    #   Tensores 3*cityN*cityN correspondentes aos ficheiros costtrain.csv, costplane.csv, costbus.csv e timetrain.csv, ...
+    #   com as rotas com escalas (connections.py) como transportes extra, a seguir a train, plane e bus;
+    #   o ponto de referencia do hypervolume e o das ligacoes diretas
+    problem = problems.Problem.biobjective(csvOpt, cityN, connectionN)
+
+    #Headless runs stream their progress and never import or wait on matplotlib
+    #   the reference point is then in the end record instead of stdout
+    stream = None
+    if telemetryPath is not None:
+        stream = telemetry.Telemetry(telemetryPath, start)
+        if viewer and telemetryPath != "-":
+            telemetry.start_viewer(telemetryPath)
+    else:
+        print(problem.ref)
+
+    # the space filling curve seed needs the coordinates of the cities
+    coordinates = None
+    if xyName is None:
+        xyName = csvOpt + "xy.csv"
+    if seedRatio > 0 and os.path.exists(xyName):
+        coordinates = seeding.read_coordinates(xyName, problem.cities)
+
+    result = solve(problem, popN, CXPB, MUTPB1, MUTPB2, selMode, decoderSize, archiveSize, epsilon, evalMode, workers, cacheSize,
+                   batchVariation, seedRatio, coordinates, seed, stop, stream, profiler, checkpointPath, checkpointEvery, resume,
+                   verbose=stream is None, plot=stream is None)
+    pareto = result["pareto"]
+
+    if stream is None:
+        print("-- End of (successful) evolution --")
+        print("Stopped by %s" % result["stop"])
+    if result["cache_hits"] is not None and stream is None:
+        print("Evaluations %i, cache hits %i" % (result["evaluations"], result["cache_hits"]))
+
+    if profilePath is not None:
+        profiler.report()
+        profiler.write(profilePath)
+
+    if stream is not None:
+        stream.front(result["g"], [ind.fitness.values for ind in result["front"]], pareto.points())
+        stream.close(g=result["g"], evaluations=result["evaluations"], hv=result["hv"], hv_pareto=result["hv_pareto"], ref=result["ref"],
+                     cache_hits=result["cache_hits"], stop=result["stop"],
+                     pareto=[ind.tolist() + [list(ind.fitness.values)] for ind in pareto])
+        return
 
-    # CXPB  is the probability with which two individuals
-    #       are crossed
-    #
-    # MUTPB is the probability for mutating an individual
-    CXPB, MUTPB1, MUTPB2 = 0.5, 0.2, 0.2
-    
-    print("Start of evolution")
-    
-    # Evaluate the entire population
-    e = 0
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
-        e += 1
-
-
-    # Variable keeping track of the number of generations
-    g = 0
-
-    #Create ParetoFront and update it with population
-    pareto = tools.ParetoFront()
-    pareto.update(pop)
-
-    #  Plot the initial Pareto front
-    def plot_pareto_front(pareto_front, non_dominated):
-        plt.figure(figsize=(8, 6))
-        plt.scatter([ind.fitness.values[0] for ind in pareto_front],
-                    [ind.fitness.values[1] for ind in pareto_front],
-                    c='blue', label='Pareto Front')
-        plt.scatter([ind.fitness.values[0] for ind in non_dominated],
-                    [ind.fitness.values[1] for ind in non_dominated],
-                    c='red', label='Current pop Pareto Front')
-        plt.title('Pareto Front')
-        plt.xlabel('Cost (f1)')
-        plt.ylabel('Time (f2)')
-        plt.legend()
-        plt.grid()
-        plt.show(block=False)
-        plt.pause(1)
-
-
-    # Calculate hypervolume for the current generation
-    non_dominated = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
-    # Plot initial Pareto front
-    plot_pareto_front(pareto, non_dominated)
-    plt.close('all')
-
-    # Begin the evolution
-    while  e < 10000:
-        # A new generation
-        g = g + 1
-        print("-- Generation %i --" % g)
-        
-        # Select the next generation individuals
-        pop = toolbox.select(pop, popN )
-        offspring = toolbox.select(pop, popN // 2 )
-
-        # Clone the selected individuals
-        offspring = list(map(toolbox.clone, offspring))
-    
-        # Apply crossover and mutation on the offspring
-        for child1, child2 in zip(offspring[::2], offspring[1::2]):
-
-            # cross two individuals with probability CXPB
-            if random.random() < CXPB:
-                toolbox.mate(child1[0], child2[0])
-
-                # fitness values of the children
-                # must be recalculated later
-                del child1.fitness.values
-                del child2.fitness.values
-
-        for mutant in offspring:
-
-            # mutate an individual with probability MUTPB
-            if random.random() < MUTPB1:
-                toolbox.mutateCities(mutant[0])
-                del mutant.fitness.values
-
-            # mutate an individual with probability MUTPB
-            if random.random() < MUTPB2:
-                toolbox.mutateTransport(mutant[1])
-                del mutant.fitness.values
-    
-    
-        # Evaluate the individuals with an invalid fitness
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            e += 1
-            ind.fitness.values = fit
-
-        #print("  Evaluated %i individuals" % len(invalid_ind))
-        #print("  Evaluated %i total individuals" % e)
-        
-        # The population is entirely replaced by the offspring
-        pop[popN//2:] = offspring
-        
-        #pareto front
-        pareto.update(pop)
-
-        
-        # Calculate hypervolume for the current generation
-        non_dominated = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
-        hv = calculate_hypervolume([ind.fitness.values for ind in non_dominated], limits)
-        hv_pareto = calculate_hypervolume([ind.fitness.values for ind in pareto], limits)
-        if g%10 == 0:
-            # Plot initial Pareto front
-            plot_pareto_front(pareto, non_dominated)
-            plt.close('all')
-        print(f"Generation {g + 1}: Hypervolume = {hv}")
-        print(f"Generation {g + 1}: Hypervolume Hall of Fame= {hv_pareto}")
-
-        
-
-    print("-- End of (successful) evolution --")
-    
-    
-    # Calculate hypervolume for the current generation
-    non_dominated = tools.sortNondominated(pop, len(pop), first_front_only=True)[0]
-    hv = calculate_hypervolume([ind.fitness.values for ind in non_dominated], limits)
-    hv_pareto = calculate_hypervolume([ind.fitness.values for ind in pareto], limits)
     # Plot initial Pareto front
-    plot_pareto_front(pareto, non_dominated)
+    plot_pareto_front(pareto, result["front"], keep=True)
     input()
 
     for best_ind in pareto: 
-        print("Best individual is %s, %s \n\n\n" % ([(cities[i] + "-" + ["train", "plane", "bus"][j]) for i,j in zip(best_ind[0], best_ind[1])], best_ind.fitness.values))
+        print("Best individual is %s, %s \n\n\n" % (legNames(best_ind, problem.cities, problem.paths), best_ind.fitness.values))
 
 if __name__ == "__main__":
     main()
@@ -18,81 +18,367 @@
 #    each of which can be 0 or 1
 
 import random
-import csv
-import getopt, sys
+import functools
+import getopt, sys, os, time
+import numpy as np
 
 from deap import base
-from deap import creator
 from deap import tools
 
-creator.create("FitnessMax", base.Fitness, weights=(-1.0,))
-creator.create("Individual", list, fitness=creator.FitnessMax)
+import problems
+import evaluation
+import variation
+import parallel
+import decoders
+import localsearch
+import seeding
+import telemetry
+import profiling
+import checkpoint
+import termination
+import genome
 
-toolbox = base.Toolbox()
+# individuals are [tour, modes] genomes held in two small arrays (see genome.py)
+#   with a cost to minimize, plain classes (not made by deap.creator) so
+#   several solvers and runs share one process
+class FitnessMin(base.Fitness):
+    weights = (-1.0,)
 
-# Structure initializers
-#                         define 'individual' to be an individual
-#                         consisting of 50 indexes of cities shuffled around
-toolbox.register("individual", tools.initIterate, creator.Individual, lambda: [random.sample(list(range(cityN)), cityN), [random.randint(0,2) for i in range(cityN)]])
+class Individual(genome.Genome):
+    __slots__ = ()
 
-# define the population to be a list of individuals
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    def __init__(self, genome=((), ())):
+        super().__init__(genome)
+        self.fitness = FitnessMin()
 
 # the goal ('fitness') function to be maximized
-def evalCost(individual):
-    sumCost = 0.0
+#   costM[m, a, b] is the cost of going from city a to city b with transport m, inf when there is no link
+#   individual[1][i] is the transport used to arrive at individual[0][i]
+def evalCost(individual, costM):
+    return float(evaluation.tour_cost(costM, np.asarray(individual[0]), np.asarray(individual[1]))),
 
-    for i in range(len(individual[0])):
-        try:
-            if i == 0:
-                sumCost += float(costM[individual[1][i]][individual[0][-1]][individual[0][i]])
+# same as evalCost for a whole list of individuals at once
+def evalCostBatch(individuals, costM):
+    if not individuals:
+        return []
+    costs = evaluation.tour_cost(costM, *evaluation.stack_genomes(individuals))
+    return [(c,) for c in costs.tolist()]
 
-            else:
-                sumCost += float(costM[individual[1][i]][individual[0][i-1]][individual[0][i]])
-        except:
-            return float('inf'),
+# same as evalCostBatch, updating the fitness of mutants from their changed legs only
+def evalCostDelta(individuals, costM):
+    return evaluation.delta_evaluate(individuals, [costM], functools.partial(evalCostBatch, costM=costM), transport=True)
 
-    return sumCost,
+# memetic local search (2-opt and Or-opt) of the cities of an evaluated individual
+#   in place, only with the decoder (costM[0] is then the cost of every leg),
+#   stopped after about maxEvaluations evaluations (None for no limit),
+#   returns the number of evaluations its partial evaluations are worth
+def improveTour(individual, costM, neighbors, rows, maxEvaluations=None):
+    tour, cost, evaluations = localsearch.improve(individual[0].tolist(), costM[0], neighbors, rows, maxEvaluations=maxEvaluations)
+    individual[0][:] = tour
+    individual.fitness.values = cost,
+    return evaluations
+
+# same as evalCostBatch with the batch split across the worker processes of pool
+def evalCostPool(individuals, pool):
+    if not individuals:
+        return []
+    costs, = pool(*evaluation.stack_genomes(individuals))
+    return [(c,) for c in costs.tolist()]
+
+# the operators of a run on the cost tensor costM, each run has its own toolbox
+def makeToolbox(costM):
+    modeN, cityN = len(costM), len(costM[0])
+    toolbox = base.Toolbox()
+
+    # Structure initializers
+    #                         define 'individual' to be an individual
+    #                         consisting of 50 indexes of cities shuffled around
+    toolbox.register("individual", tools.initIterate, Individual, lambda: [random.sample(list(range(cityN)), cityN), [random.randint(0,modeN-1) for i in range(cityN)]])
+
+    # define the population to be a list of individuals
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    #----------
+    # Operator registration
+    #----------
+    # register the goal / fitness function
+    toolbox.register("evaluate", evalCost, costM=costM)
+    toolbox.register("evaluateBatch", evalCostBatch, costM=costM)
+
+    # register the crossover operator
+    toolbox.register("mate", tools.cxPartialyMatched)
+
+    # register a mutation operator with a probability to
+    # flip each attribute/gene of 0.05
+    toolbox.register("mutateCities", variation.mutShuffleIndexes, indpb=0.05, gene=0)
+    toolbox.register("mutateTransport", variation.mutUniformInt, indpb=0.05, low=0, up=2, gene=1)
+
+    # the crossover and both mutations over the whole offspring at once
+    toolbox.register("vary", variation.vary_batch, indpb=0.05, transport=True, transportIndpb=0.05, low=0, up=2)
+
+    # operator for selecting individuals for breeding the next
+    # generation: each individual of the current generation
+    # is replaced by the 'fittest' (best) of three individuals
+    # drawn randomly from the current generation.
+    toolbox.register("select", tools.selTournament, tournsize = 4)
+    return toolbox
 
 #----------
-# Operator registration
-#----------
-# register the goal / fitness function
-toolbox.register("evaluate", evalCost)
 
-# register the crossover operator
-toolbox.register("mate", tools.cxPartialyMatched)
+# initial population of popN individuals, a fraction seedRatio of them built by
+#   the construction heuristics of seeding.py on the cheapest transport of every
+#   leg, which they then take, and the others at random
+def initialPopulation(toolbox, costM, popN, seedRatio, coordinates=None):
+    bestMode, bestCost = decoders.best_modes(costM)
+    seeds = seeding.seed_tours(int(round(seedRatio * popN)), bestCost, coordinates)
+    return [Individual([tour, bestMode[np.roll(tour, 1), tour].tolist()]) for tour in seeds] + toolbox.population(n=popN - len(seeds))
+
+# solves a problem (problems.Problem) and returns the results as a dict: the
+#   best cost and [tour, modes], the generations and evaluations, the cache
+#   hits, the stop reason and the final population
+#   stop is a termination.Termination (10000 evaluations by default), progress
+#   goes to stream (telemetry.Telemetry) and to stdout with verbose, the phases
+#   to profiler (profiling.Profiler)
+def solve(problem, popN=100, CXPB=0.6, MUTPB1=0.2, MUTPB2=0.4, LSPB=0.0, decoder=False, evalMode="batch", workers=None, cacheSize=0,
+          batch=False, seedRatio=0.0, coordinates=None, seed=None, stop=None, stream=None, profiler=None,
+          checkpointPath=None, checkpointEvery="10", resume=False, verbose=False):
+    random.seed(seed)
+    if stop is None:
+        stop = termination.Termination()
+    if profiler is None:
+        profiler = profiling.NullProfiler()
+
+    costM = problem.cost
+    cityN = problem.cityN
+    if LSPB > 0:
+        decoder = True
+    if decoder:
+        #The cheapest transport of every leg is known in advance: costM is
+        #reduced to that single transport and the transport genes stay 0
+        bestMode, bestCost = decoders.best_modes(costM)
+        costM = bestCost[np.newaxis]
+    toolbox = makeToolbox(costM)
+    if decoder:
+        toolbox.register("improve", improveTour, costM=costM, neighbors=localsearch.neighbor_lists(costM[0]), rows=costM[0].tolist())
+
+    pool = None
+    if evalMode == "batch":
+        toolbox.register("evaluatePop", toolbox.evaluateBatch)
+    elif evalMode == "delta":
+        toolbox.register("evaluatePop", evalCostDelta, costM=costM)
+        # mutation operators keep what they change for the delta evaluation
+        toolbox.register("mutateCities", toolbox.mutateCities, record=True)
+        toolbox.register("mutateTransport", toolbox.mutateTransport, record=True)
+        toolbox.register("vary", toolbox.vary, record=True)
+    elif evalMode == "pool":
+        pool = parallel.PoolEvaluator([costM], workers)
+        toolbox.register("evaluatePop", evalCostPool, pool=pool)
+    else:
+        toolbox.register("evaluatePop", evaluation.map_evaluate, toolbox.evaluate)
+
+    # the worker processes and shared memory of the pool are released even
+    # when the run fails
+    try:
+        # cached fitnesses are not evaluated again and do not count against the budget
+        cache = None
+        if cacheSize > 0:
+            cache = evaluation.FitnessCache(toolbox.evaluatePop, evaluation.genome_key, cacheSize)
+            toolbox.register("evaluatePop", cache)
+
+        if decoder:
+            MUTPB2 = 0.0
+
+        if stream is not None:
+            stream.phase("init")
 
-# register a mutation operator with a probability to
-# flip each attribute/gene of 0.05
-toolbox.register("mutateCities", tools.mutShuffleIndexes, indpb=0.05)
-toolbox.register("mutateTransport", tools.mutUniformInt, indpb=0.05, low=0, up=2)
+        schedule = checkpoint.Schedule(checkpointEvery) if checkpointPath is not None else None
+        if resume and checkpointPath is not None and os.path.exists(checkpointPath):
+            # the population, counters, cache and random state of the last checkpoint
+            pop, e, g = checkpoint.load_run(checkpointPath, Individual, cache, termination=stop, cities=cityN, population=popN, decoder=decoder)
+            if verbose:
+                print("Resuming evolution at generation %i" % g)
+        else:
+            with profiler.phase("init"):
+                pop = initialPopulation(toolbox, costM, popN, seedRatio, coordinates)
+        
+            if verbose:
+                print("Start of evolution")
+        
+            # Evaluate the entire population
+            e = 0
+            with profiler.phase("evaluate"):
+                fitnesses = toolbox.evaluatePop(pop)
+                for ind, fit in zip(pop, fitnesses):
+                    ind.fitness.values = fit
+                    e += 1
+            profiler.count("evaluations", len(pop))
+            if cache is not None:
+                e = cache.misses
+        
+            #print("  Evaluated %i individuals" % len(pop))
+            #print("  Evaluated %i total individuals" % e)
+
+            # Variable keeping track of the number of generations
+            g = 0
+
+        # Extracting all the fitnesses of 
+        fits = [ind.fitness.values[0] for ind in pop]
+
+        profiler.next_generation(g)
+        if stream is not None:
+            stream.generation(g, e, best=min(fits))
+            stream.phase("evolve")
+        # Begin the evolution
+        while not stop.done(e, min(fits)):
+            # A new generation
+            g = g + 1
+            if verbose:
+                print("-- Generation %i --" % g)
+        
+            # Select the next generation individuals
+            with profiler.phase("select"):
+                offspring = toolbox.select(pop, popN)
+                offspring = toolbox.select(pop, popN // 3 )
+            # Clone the selected individuals
+            with profiler.phase("clone"):
+                offspring = list(map(toolbox.clone, offspring))
+            profiler.count("clones", len(offspring))
+    
+            # Apply crossover and mutation on the offspring
+            if batch:
+                # the same operators on the whole offspring at once (see variation.py)
+                with profiler.phase("vary"):
+                    toolbox.vary(offspring, CXPB, MUTPB1, transportpb=MUTPB2)
+            else:
+                with profiler.phase("mate"):
+                    for child1, child2 in zip(offspring[::2], offspring[1::2]):
+
+                        # cross two individuals with probability CXPB
+                        if random.random() < CXPB:
+                            toolbox.mate(child1[0], child2[0])
+
+                            # fitness values of the children
+                            # must be recalculated later
+                            del child1.fitness.values
+                            del child2.fitness.values
+
+                with profiler.phase("mutate"):
+                    for mutant in offspring:
+
+                        # mutate an individual with probability MUTPB
+                        if random.random() < MUTPB1:
+                            toolbox.mutateCities(mutant)
+                            del mutant.fitness.values
+
+                        # mutate an individual with probability MUTPB
+                        if random.random() < MUTPB2:
+                            toolbox.mutateTransport(mutant)
+                            del mutant.fitness.values
+    
+    
+            # Evaluate the individuals with an invalid fitness
+            with profiler.phase("evaluate"):
+                invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+                hits = cache.hits if cache is not None else 0
+                fitnesses = toolbox.evaluatePop(invalid_ind)
+                for ind, fit in zip(invalid_ind, fitnesses):
+                    e += 1
+                    ind.fitness.values = fit
+            profiler.count("evaluations", len(invalid_ind))
+            profiler.count("inf", sum(1 for fit in fitnesses if fit[0] == float('inf')))
+            # cache hits were not evaluated
+            if cache is not None:
+                e -= cache.hits - hits
+                profiler.count("cache hits", cache.hits - hits)
 
-# operator for selecting individuals for breeding the next
-# generation: each individual of the current generation
-# is replaced by the 'fittest' (best) of three individuals
-# drawn randomly from the current generation.
-toolbox.register("select", tools.selTournament, tournsize = 4)
+            # without local search toolbox.improve is not registered and nothing is drawn
+            if LSPB > 0:
+                with profiler.phase("improve"):
+                    for ind in offspring:
+                        # the local search stops where the evaluation budget does
+                        left = None if stop.evaluations is None else stop.evaluations - e
+                        if random.random() < LSPB and (left is None or left > 0):
+                            e += toolbox.improve(ind, maxEvaluations=left)
+
+            #print("  Evaluated %i individuals" % len(invalid_ind))
+            #print("  Evaluated %i total individuals" % e)
+        
+            # The population is entirely replaced by the offspring
+            pop[popN//3:] = offspring
+        
+            with profiler.phase("report"):
+                # Gather all the fitnesses in one list and print the stats
+                fits = [ind.fitness.values[0] for ind in pop]
+            
+                length = len(pop)
+                mean = sum(fits) / length
+                sum2 = sum(x*x for x in fits)
+                std = abs(sum2 / length - mean**2)**0.5
+            
+                if stream is not None:
+                    stream.generation(g, e, best=min(fits), mean=mean, std=std)
+                if verbose:
+                    print("  Min %s" % min(fits))
+                    print("  Max %s" % max(fits))
+                    print("  Avg %s" % mean)
+                    print("  Std %s" % std)
+            profiler.next_generation(g)
+
+            if schedule is not None and schedule.due(g):
+                checkpoint.save_run(checkpointPath, pop, e, g, cache, termination=stop, cities=cityN, population=popN, decoder=decoder)
+    
+    finally:
+        if pool is not None:
+            pool.close()
+
+    best_ind = tools.selBest(pop, 1)[0]
+    if decoder:
+        best_ind[1] = bestMode[np.roll(best_ind[0], 1), best_ind[0]].tolist()
+    return {"g": g, "evaluations": e, "best": best_ind.fitness.values[0], "individual": best_ind.tolist(),
+            "cache_hits": None if cache is None else cache.hits, "stop": stop.reason, "pop": pop}
 
 #----------
 
 def main():
-    #random.seed(64)
+    start = time.perf_counter()
 
     # create an initial population of 300 individuals (where
     # each individual is a list of integers)
     argList = sys.argv[1:]
-    options = "hf:n:c:"
+    options = "hf:n:c:e:w:l:bdp:r:x:o:"
+    LSPB = 0.0
+    decoder = False
+    cacheSize = 0
+    batchVariation = False
+    evalMode = "batch"
+    workers = None
+    seedRatio = 0.0
+    xyName = "xy.csv"
+    seed = None
+    telemetryPath = None
+    profilePath = None
+    checkpointPath = None
+    checkpointEvery = "10"
+    resume = False
+    maxEvaluations = 10000
+    maxTime = None
+    target = None
+    stagnation = None
+    tolerance = 0.0
+    # CXPB  is the probability with which two individuals
+    #       are crossed
+    #
+    # MUTPB is the probability for mutating an individual
+    CXPB, MUTPB1, MUTPB2 = 0.6, 0.2, 0.4
     csvOpt = "time"
     popN = 100
-    global cityN
     cityN = 30
     try:
         
-        arguments, values = getopt.getopt(argList, options, "")
+        arguments, values = getopt.getopt(argList, options, ["seed=", "profile=", "checkpoint=", "checkpoint-every=", "resume", "max-evaluations=", "max-time=", "target=", "stagnation=", "tolerance=", "cxpb=", "mutpb=", "mutpb-transport="])
         for arg, value in arguments:
             if arg == "-h":
-                print("-f  cost  or time Default: time\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30")
+                print("-f  cost  or time Default: time\n-n  Population size Default: 100 \n-c Nunber of cities Default: 30\n-e Evaluation mode, single, batch, delta or pool Default: batch\n-w Number of worker processes for -e pool Default: all cores\n-l Size of the fitness cache, 0 for none Default: 0\n-b Vary the offspring as one array, with vectorized crossover and mutation\n-d Decode the transports, each leg takes its cheapest one and only the cities are evolved\n-p Probability of improving an offspring with 2-opt/Or-opt local search, implies -d Default: 0\n-r Fraction of the initial population built by construction heuristics Default: 0\n-x .csv file with the city coordinates for -r Default: xy.csv\n-o Headless run, progress is streamed as JSON lines to this file (- for stdout) Default: none\n--seed Seed of the random number generator, for reproducible runs Default: none\n--profile Time and count the phases of each generation, summary on stderr and per-generation trace saved to this .csv file Default: none\n--checkpoint Save the state of the run to this file Default: none\n--checkpoint-every Checkpoint every N generations, or every N seconds with Ns Default: 10\n--resume Continue from the --checkpoint file when it exists\n--max-evaluations Evaluation budget Default: 10000\n--max-time Wall-clock limit in seconds Default: none\n--target Stop once the best cost is at most this value Default: none\n--stagnation Stop after this many generations without improving the best cost Default: none\n--tolerance Smallest improvement for --stagnation, fraction of the best cost Default: 0\n--cxpb Probability of crossing each pair of offspring Default: 0.6\n--mutpb Probability of mutating the cities of each offspring Default: 0.2\n--mutpb-transport Probability of mutating the transports of each offspring Default: 0.4")
                 exit()
             elif arg == "-f":
                 csvOpt = value
@@ -100,117 +386,92 @@ def main():
                 popN = int(value)
             elif arg == "-c":
                 cityN = int(value)
+            elif arg == "-e":
+                evalMode = value
+            elif arg == "-w":
+                workers = int(value)
+            elif arg == "-l":
+                cacheSize = int(value)
+            elif arg == "-b":
+                batchVariation = True
+            elif arg == "-d":
+                decoder = True
+            elif arg == "-p":
+                LSPB = float(value)
+            elif arg == "-r":
+                seedRatio = float(value)
+            elif arg == "-x":
+                xyName = value
+            elif arg == "-o":
+                telemetryPath = value
+            elif arg == "--seed":
+                seed = int(value)
+            elif arg == "--profile":
+                profilePath = value
+            elif arg == "--checkpoint":
+                checkpointPath = value
+            elif arg == "--checkpoint-every":
+                checkpointEvery = value
+            elif arg == "--resume":
+                resume = True
+            elif arg == "--max-evaluations":
+                maxEvaluations = int(value)
+            elif arg == "--max-time":
+                maxTime = float(value)
+            elif arg == "--target":
+                target = float(value)
+            elif arg == "--stagnation":
+                stagnation = int(value)
+            elif arg == "--tolerance":
+                tolerance = float(value)
+            elif arg == "--cxpb":
+                CXPB = float(value)
+            elif arg == "--mutpb":
+                MUTPB1 = float(value)
+            elif arg == "--mutpb-transport":
+                MUTPB2 = float(value)
         
     except getopt.error as err:
         print(str(err))
 
-    global costM 
-    costM = [[], [], []]
-    for i, j in enumerate(["train.csv", "plane.csv", "bus.csv"]):
-        csvName =  csvOpt + j
-        with open(csvName, "r") as fp:
-            reader = csv.reader(fp)
-            #Get first row
-            cities = next(reader)[1:cityN +1]
-            #Get Cost matrix
-            for k, row in enumerate(reader):
-                if k >= cityN:
-                    break
-                else:
-                    costM[i].append(row[1:cityN +1])
-
-    pop = toolbox.population(n=popN)
+    # the run stops at the first of its stop criteria (see termination.py)
+    stop = termination.Termination(maxEvaluations, maxTime, target, stagnation, tolerance)
 
-    # CXPB  is the probability with which two individuals
-    #       are crossed
-    #
-    # MUTPB is the probability for mutating an individual
-    CXPB, MUTPB1, MUTPB2 = 0.6, 0.2, 0.4
-    
-    print("Start of evolution")
-    
-    # Evaluate the entire population
-    e = 0
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
-        ind.fitness.values = fit
-        e += 1
-    
-    #print("  Evaluated %i individuals" % len(pop))
-    #print("  Evaluated %i total individuals" % e)
-
-    # Extracting all the fitnesses of 
-    fits = [ind.fitness.values[0] for ind in pop]
-
-    # Variable keeping track of the number of generations
-    g = 0
-    # Begin the evolution
-    while  e < 10000:
-        # A new generation
-        g = g + 1
-        print("-- Generation %i --" % g)
-        
-        # Select the next generation individuals
-        offspring = toolbox.select(pop, popN)
-        offspring = toolbox.select(pop, popN // 3 )
-        # Clone the selected individuals
-        offspring = list(map(toolbox.clone, offspring))
-    
-        # Apply crossover and mutation on the offspring
-        for child1, child2 in zip(offspring[::2], offspring[1::2]):
+    # timers and counters of the phases of a generation
+    profiler = profiling.NullProfiler()
+    if profilePath is not None:
+        profiler = profiling.Profiler("evolutionaryTransport")
 
-            # cross two individuals with probability CXPB
-            if random.random() < CXPB:
-                toolbox.mate(child1[0], child2[0])
+    # headless runs stream their progress (see telemetry.py) instead of printing it
+    stream = None
+    if telemetryPath is not None:
+        stream = telemetry.Telemetry(telemetryPath, start)
 
-                # fitness values of the children
-                # must be recalculated later
-                del child1.fitness.values
-                del child2.fitness.values
+    problem = problems.Problem.transport(csvOpt, cityN)
 
-        for mutant in offspring:
+    # the space filling curve seed needs the coordinates of the cities
+    coordinates = None
+    if seedRatio > 0 and os.path.exists(xyName):
+        coordinates = seeding.read_coordinates(xyName, problem.cities)
 
-            # mutate an individual with probability MUTPB
-            if random.random() < MUTPB1:
-                toolbox.mutateCities(mutant[0])
-                del mutant.fitness.values
+    result = solve(problem, popN, CXPB, MUTPB1, MUTPB2, LSPB, decoder, evalMode, workers, cacheSize, batchVariation, seedRatio, coordinates,
+                   seed, stop, stream, profiler, checkpointPath, checkpointEvery, resume, verbose=stream is None)
+
+    if profilePath is not None:
+        profiler.report()
+        profiler.write(profilePath)
+
+    if stream is not None:
+        stream.close(g=result["g"], evaluations=result["evaluations"], best=result["best"], individual=result["individual"],
+                     cache_hits=result["cache_hits"], stop=result["stop"])
+        return
 
-            # mutate an individual with probability MUTPB
-            if random.random() < MUTPB2:
-                toolbox.mutateTransport(mutant[1])
-                del mutant.fitness.values
-    
-    
-        # Evaluate the individuals with an invalid fitness
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            e += 1
-            ind.fitness.values = fit
-
-        #print("  Evaluated %i individuals" % len(invalid_ind))
-        #print("  Evaluated %i total individuals" % e)
-        
-        # The population is entirely replaced by the offspring
-        pop[popN//3:] = offspring
-        
-        # Gather all the fitnesses in one list and print the stats
-        fits = [ind.fitness.values[0] for ind in pop]
-        
-        length = len(pop)
-        mean = sum(fits) / length
-        sum2 = sum(x*x for x in fits)
-        std = abs(sum2 / length - mean**2)**0.5
-        
-        print("  Min %s" % min(fits))
-        print("  Max %s" % max(fits))
-        print("  Avg %s" % mean)
-        print("  Std %s" % std)
-    
     print("-- End of (successful) evolution --")
-    
-    best_ind = tools.selBest(pop, 1)[0]
-    print("Best individual is %s, %s" % ([(cities[i] + "-" + ["train", "plane", "bus"][j]) for i,j in zip(best_ind[0], best_ind[1])], best_ind.fitness.values))
+    print("Stopped by %s" % result["stop"])
+    if result["cache_hits"] is not None:
+        print("Evaluations %i, cache hits %i" % (result["evaluations"], result["cache_hits"]))
+    tour, modes = result["individual"]
+    print("Best individual is %s, %s" % ([(problem.cities[i] + "-" + ["train", "plane", "bus"][j]) for i,j in zip(tour, modes)], (result["best"],)))
 
 if __name__ == "__main__":
     main()
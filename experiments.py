@@ -0,0 +1,248 @@
+"""
+Replicated experiments over a grid of solver parameters.
+
+Every combination of the grid values is run with the same replicate seeds,
+each run being an independent headless solver process (benchmark.run) and
+the runs spread over the cores:
+
+    python experiments.py -p evolutionary.py -g n=50,100 -g cxpb=0.5,0.7 -g mutpb=0.2,0.4 -r 10 -o tuning.csv
+
+A grid parameter is a solver option without its dashes: c and n are the
+city count and population size, other single letters are short options
+(-g e=batch,delta) and longer names long options (-g cxpb=0.5,0.7); on and
+off include or leave out a flag (-g b=on,off).
+
+One row per run is appended to the output table as soon as the run ends; a
+run that times out (-t) or fails gets a row with no final quality and the
+reason in stop, and is left out of the summaries.
+At the end each cell of the grid is summarized by the mean, median and
+interquartile range of the final quality (best cost, or hypervolume of the
+archive for evolutionaryMO.py) into a .summary.csv table. For
+evolutionaryMO.py the best, median and worst attainment surfaces of the
+final archives of each cell (the points reached by at least 1, half and all
+of its runs) also go to a .attainment.csv table.
+"""
+
+import csv
+import getopt
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import benchmark
+import moea
+
+INF = float("inf")
+
+
+def solver_arguments(name, value):
+    """Command line arguments of grid parameter name set to value."""
+    option = "-" + name if len(name) == 1 else "--" + name
+    if value == "on":
+        return [option]
+    if value == "off":
+        return []
+    return [option, value]
+
+
+def cells(grid):
+    """All the combinations of the grid, as a list of {name: value} dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def failed_run(program, cell, seed, error):
+    """Row of a run that did not finish: no final quality and the reason in stop."""
+    if isinstance(error, subprocess.TimeoutExpired):
+        stop = "timeout"
+    elif isinstance(error, subprocess.CalledProcessError):
+        stop = "failed: exit status %i" % error.returncode
+    else:
+        stop = "failed: %s" % error
+    return {"program": program, "cell": cell, "seed": seed, "metric": benchmark.metric(program)[0], "final": None,
+            "generations": None, "evaluations": None, "time": None, "stop": stop, "failed": True}
+
+
+def attainment_surface(fronts, k):
+    """
+    k-th attainment surface of bi-objective fronts (both minimized): the
+    non-dominated points reached (weakly dominated) by at least k of the
+    fronts, empty fronts included in the count.
+
+    Returns:
+    - The points of the surface sorted by the first objective.
+    """
+    fronts = [[(x, y) for x, y in front if x < INF and y < INF] for front in fronts]
+    surface = []
+    for x in sorted({x for front in fronts for x, y in front}):
+        # the best second objective each front reaches within x, k-th best of them
+        levels = sorted(min((fy for fx, fy in front if fx <= x), default=INF) for front in fronts)
+        y = levels[k - 1]
+        if y < INF and (not surface or y < surface[-1][1]):
+            surface.append((x, y))
+    return surface
+
+
+def attainment_levels(R):
+    """(name, k) of the best, median and worst attainment surfaces of R runs."""
+    return [("best", 1), ("median", (R + 1) // 2), ("worst", R)]
+
+
+def quartiles(values):
+    """First quartile, median and third quartile of values."""
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    q1, median, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    return q1, median, q3
+
+
+def summarize(runs, names):
+    """
+    Statistics of the final quality of each cell of runs.
+
+    Returns:
+    - One dict per cell with its parameters, the number of runs, mean,
+      median, q1, q3, iqr, min and max of the final quality, the median time
+      and evaluations and, for evolutionaryMO.py, the hypervolume of its
+      best, median and worst attainment surfaces.
+    """
+    groups = {}
+    for r in runs:
+        groups.setdefault((r["program"],) + tuple(r["cell"][name] for name in names), []).append(r)
+    summary = []
+    for key, group in groups.items():
+        finals = [r["final"] for r in group if r["final"] is not None]
+        row = dict(zip(["program"] + names, key), runs=len(group))
+        if finals:
+            q1, median, q3 = quartiles(finals)
+            row.update(mean=statistics.mean(finals), median=median, q1=q1, q3=q3, iqr=q3 - q1, min=min(finals), max=max(finals))
+        row["time"] = statistics.median(r["time"] for r in group)
+        row["evaluations"] = statistics.median(r["evaluations"] for r in group)
+        fronts = [r["front"] for r in group if r.get("front") is not None]
+        if fronts and group[0].get("ref") is not None:
+            for level, k in attainment_levels(len(fronts)):
+                row["hv_" + level] = moea.hypervolume(attainment_surface(fronts, k), group[0]["ref"])
+        summary.append(row)
+    return summary
+
+
+def main():
+    argList = sys.argv[1:]
+    options = "hp:g:r:s:j:a:o:d:t:"
+    programs = ["evolutionary.py"]
+    grid = {}
+    replicates = 5
+    firstSeed = 1
+    jobs = os.cpu_count()
+    extra = []
+    outPath = "experiment.csv"
+    datasets = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets")
+    timeout = None
+    try:
+        arguments, values = getopt.getopt(argList, options, "")
+        for arg, value in arguments:
+            if arg == "-h":
+                print("-p Solvers to run, comma separated Default: evolutionary.py\n-g Grid parameter as name=value,value,... (c, n, a solver option without dashes, on/off for flags), repeatable Default: none\n-r Replicates (seeds) of each cell Default: 5\n-s First seed, the replicates use the following ones Default: 1\n-j Runs in parallel Default: all cores\n-a Extra arguments for every run, e.g. \"-e delta\" Default: none\n-o Output .csv table of the runs, the summary and attainment tables are saved next to it Default: experiment.csv\n-d Datasets directory the solvers run from Default: datasets\n-t Timeout of a run in seconds Default: none")
+                exit()
+            elif arg == "-p":
+                programs = value.split(",")
+            elif arg == "-g":
+                name, choices = value.split("=", 1)
+                grid[name.lstrip("-")] = choices.split(",")
+            elif arg == "-r":
+                replicates = int(value)
+            elif arg == "-s":
+                firstSeed = int(value)
+            elif arg == "-j":
+                jobs = int(value)
+            elif arg == "-a":
+                extra = value.split()
+            elif arg == "-o":
+                outPath = value
+            elif arg == "-d":
+                datasets = value
+            elif arg == "-t":
+                timeout = float(value)
+
+    except getopt.error as err:
+        print(str(err))
+
+    names = list(grid)
+    seeds = range(firstSeed, firstSeed + replicates)
+    tasks = [(program, cell, seed) for program in programs for cell in cells(grid) for seed in seeds]
+
+    def runCell(program, cell, seed):
+        # c and n are the arguments of benchmark.run, the rest extra arguments of the solver
+        arguments = list(extra)
+        for name, value in cell.items():
+            if name not in ("c", "n"):
+                arguments += solver_arguments(name, value)
+        r = benchmark.run(program, int(cell.get("c", 30)), int(cell.get("n", 100)), seed, arguments, datasets, timeout)
+        r["cell"] = cell
+        return r
+
+    # each run is its own process, the threads only wait for them
+    columns = ["program"] + names + ["seed", "metric", "final", "generations", "evaluations", "time", "stop"]
+    print(("%-26s " + "%10s " * len(names) + "%5s %14s %9s %s") % tuple(["program"] + names + ["seed", "final", "time", "stop"]))
+    with open(outPath, "w", newline="") as fp, ThreadPoolExecutor(max_workers=jobs) as executor:
+        writer = csv.writer(fp)
+        writer.writerow(columns)
+        futures = {executor.submit(runCell, *task): task for task in tasks}
+        results = {}
+        for future in as_completed(futures):
+            # a run that times out or crashes is recorded, the others go on
+            try:
+                r = future.result()
+            except Exception as err:
+                r = failed_run(*futures[future], err)
+            results[future] = r
+            writer.writerow([r["program"]] + [r["cell"][name] for name in names] +
+                            [r["seed"], r["metric"], r["final"], r["generations"], r["evaluations"], r["time"], r.get("stop")])
+            fp.flush()
+            if r.get("failed"):
+                print(("%-26s " + "%10s " * len(names) + "%5i %14s %9s %s") % tuple([r["program"]] + [r["cell"][name] for name in names] +
+                                                                                [r["seed"], "", "", r["stop"]]))
+            else:
+                print(("%-26s " + "%10s " * len(names) + "%5i %14.6g %9.2f %s") % tuple([r["program"]] + [r["cell"][name] for name in names] +
+                                                                                 [r["seed"], r["final"], r["time"], r.get("stop")]))
+
+    # summaries in the order of the grid, of the runs that finished
+    runs = [results[future] for future in futures if not results[future].get("failed")]
+    base = os.path.splitext(outPath)[0]
+    summary = summarize(runs, names)
+    summaryColumns = ["program"] + names + ["runs", "mean", "median", "q1", "q3", "iqr", "min", "max", "time", "evaluations",
+                                            "hv_best", "hv_median", "hv_worst"]
+    with open(base + ".summary.csv", "w", newline="") as fp:
+        writer = csv.DictWriter(fp, summaryColumns)
+        writer.writeheader()
+        writer.writerows(summary)
+
+    print(("\n%-26s " + "%10s " * len(names) + "%5s %14s %14s %14s %14s") % tuple(["summary"] + names + ["runs", "mean", "median", "q1", "q3"]))
+    for row in summary:
+        print(("%-26s " + "%10s " * len(names) + "%5i %14.6g %14.6g %14.6g %14.6g") % tuple([row["program"]] + [row[name] for name in names] +
+                                                                                    [row["runs"]] + [row.get(s, float("nan")) for s in ("mean", "median", "q1", "q3")]))
+
+    # attainment surfaces of the cells of evolutionaryMO.py
+    surfaces = []
+    groups = {}
+    for r in runs:
+        if r.get("front") is not None:
+            groups.setdefault((r["program"],) + tuple(r["cell"][name] for name in names), []).append(r["front"])
+    for key, fronts in groups.items():
+        for level, k in attainment_levels(len(fronts)):
+            for x, y in attainment_surface(fronts, k):
+                surfaces.append(list(key) + [level, k, x, y])
+    if surfaces:
+        with open(base + ".attainment.csv", "w", newline="") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(["program"] + names + ["surface", "k", "cost", "time"])
+            writer.writerows(surfaces)
+
+    print("Results saved to %s, %s.summary.csv%s" % (outPath, base, ", %s.attainment.csv" % base if surfaces else ""))
+
+
+if __name__ == "__main__":
+    main()
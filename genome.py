@@ -0,0 +1,87 @@
+"""
+Compact [tour, modes] genome for the transport solvers.
+
+Genome keeps the cities of the tour in an int16 array and the transport of
+every leg in an int8 array, instead of two lists of Python ints. It behaves
+as the [tour, modes] list it replaces: genome[0] and genome[1] are the
+arrays themselves, so the DEAP and variation.py operators change them in
+place (tools.cxPartialyMatched(child1[0], child2[0])), and
+np.asarray(genome[0]) costs nothing. Cloning copies the two buffers and the
+fitness:
+
+    class Individual(genome.Genome):
+        __slots__ = ()
+
+        def __init__(self, genome=((), ())):
+            super().__init__(genome)
+            self.fitness = FitnessMin()
+
+    ind = Individual([tour, modes])
+    child = toolbox.clone(ind)
+
+The attributes the solvers set on individuals (fitness, the delta record of
+variation.py, the decoded alternatives, the rank and crowding of moea.py)
+live in __slots__, so a genome of N cities takes about 3N bytes and a few
+hundred bytes of overhead.
+"""
+
+import copy
+
+import numpy as np
+
+
+class Genome:
+    """
+    [tour, modes] genome as an int16 and an int8 array.
+
+    Parameters:
+    - genome: The [tour, modes] pair, any sequences of ints.
+    """
+
+    __slots__ = ("tour", "modes", "fitness", "delta", "alternatives", "rank", "crowding")
+
+    def __init__(self, genome=((), ())):
+        tour, modes = genome
+        self.tour = np.array(tour, dtype=np.int16)
+        self.modes = np.array(modes, dtype=np.int8)
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, gene):
+        return (self.tour, self.modes)[gene]
+
+    def __setitem__(self, gene, value):
+        (self.tour, self.modes)[gene][:] = value
+
+    def __iter__(self):
+        yield self.tour
+        yield self.modes
+
+    def __deepcopy__(self, memo):
+        clone = self.__class__.__new__(self.__class__)
+        clone.tour = self.tour.copy()
+        clone.modes = self.modes.copy()
+        clone.fitness = copy.deepcopy(self.fitness, memo)
+        for name in ("delta", "alternatives", "rank", "crowding"):
+            value = getattr(self, name, None)
+            if value is not None:
+                setattr(clone, name, copy.deepcopy(value, memo))
+        return clone
+
+    def __reduce__(self):
+        # Pickled as its class, genome and fitness (slots have no __dict__)
+        return _rebuild, (self.__class__, self.tolist(), self.fitness)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.tolist())
+
+    def tolist(self):
+        """The [tour, modes] genome as lists of Python ints."""
+        return [self.tour.tolist(), self.modes.tolist()]
+
+
+def _rebuild(cls, genome, fitness):
+    ind = cls(genome)
+    ind.fitness = fitness
+    return ind
@@ -1,67 +1,112 @@
-import pandas as pd
+"""
+Candidate lists: the k best destinations of every city.
 
-def nested_dict_maker(file_path):
-    data = pd.read_csv(file_path)
+For every origin city and transport the destinations are ranked by a
+weighted blend of time and cost (0.9 time + 0.1 cost by default), and a
+last "any" layer ranks them by their best transport. The k best are picked
+with a partial sort of the whole matrix at once, which takes milliseconds,
+so the index is computed on demand and not persisted. The solvers call
+k_best on the matrix they optimize to seed tours (seeding.py) and for the
+neighbour lists of the local search (localsearch.py).
 
-    nested_dict = {}
+    python heuristics.py [-f dataset prefix] [-k candidates] [-c cities]
 
-    for i, row in data.iterrows():
-        origin_city = row['City']
-        nested_dict[origin_city] = {destination: (int(time) if time != '-' else str(time)) for destination, time in row.items() if destination != 'City'}
+prints the plane candidates of every city and how often each city is a
+candidate of another one.
+"""
 
-    return nested_dict
+import getopt, sys
 
-def find_N_best_connections(conections_time, conections_price, cities, N):
-    best_cities = {}
-    counter = 0
-    skipped = 0
+import numpy as np
 
-    for city in cities:
-        if conections_time[city] == "-" or conections_price[city] == "-":
-            skipped += 1
-            continue
-        weighted_sum = 0.9 * conections_time[city] + 0.1 * conections_price[city]
-        if counter < N:
-            best_cities[city] = weighted_sum
-            # if max_weighted_sum_of_5 < weighted_sum:
-            #     max_weighted_sum_of_5 = weighted_sum
-        else:
-            if max(best_cities.values()) > weighted_sum:
-                best_cities.pop(max(best_cities, key=best_cities.get))
-                best_cities[city] = weighted_sum
-        counter += 1
+import matrices
 
-    return list(best_cities.keys())
+#Layers of candidate_index: one per transport then the best of all of them
+LAYERS = matrices.MODES + ["any"]
 
-def init_heuristics():
-    best_connections = {}
-    for city in dict_keys:
-        best_connections[city] = find_N_best_connections(dict_time_plane[city], dict_cost_plane[city], dict_keys, 10)
 
-        for city_found in best_connections[city]:
-            if city_found not in repeated_connections:
-                repeated_connections[city_found] = 0
-            repeated_connections[city_found] += 1
+def k_best(matrix, k):
+    """
+    The k smallest entries of every row of matrix.
 
-        print(best_connections[city])
-    return
-
-time_plane_file = "./datasets/timeplane.csv"
-cost_plane_file = "./datasets/costplane.csv"
-
-dict_time_plane = nested_dict_maker(time_plane_file)
-dict_cost_plane = nested_dict_maker(cost_plane_file)
-
-dict_keys = list(dict_time_plane.keys())
-
-
-repeated_connections = {}
-
-
-
-print(50*"==")
-for city in dict_keys:
-    if city in repeated_connections:
-        print(f"Rpeated {city}: {repeated_connections[city]}")
+    Returns:
+    - (N, k) array of column indexes ordered by value, -1 where a row has
+      fewer than k finite entries.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    k = min(k, matrix.shape[1])
+    if k < matrix.shape[1]:
+        best = np.argpartition(matrix, k - 1, axis=1)[:, :k]
     else:
-        print(f"Rpeated {city}: 0")
\ No newline at end of file
+        best = np.tile(np.arange(matrix.shape[1]), (len(matrix), 1))
+    values = np.take_along_axis(matrix, best, axis=1)
+    order = np.argsort(values, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best[~np.isfinite(np.take_along_axis(values, order, axis=1))] = -1
+    return best
+
+
+def blend(costT, timeT, weights=(0.1, 0.9)):
+    """weights[0] * cost + weights[1] * time, inf where either is missing."""
+    return weights[0] * np.asarray(costT) + weights[1] * np.asarray(timeT)
+
+
+def candidate_index(prefix="", k=10, cityN=None, weights=(0.1, 0.9), cache=True):
+    """
+    Candidate lists of the datasets prefix + "cost"/"time" + transport + ".csv".
+
+    Parameters:
+    - cache: Load the matrices through the matrix cache (matrices.load_tensor).
+
+    Returns:
+    - (len(LAYERS), cityN, k) array: index[layer, a] are the k best
+      destinations from city a, -1 padded.
+    """
+    cities, costT = matrices.load_modes(prefix + "cost", cityN, cache)
+    cities, timeT = matrices.load_modes(prefix + "time", cityN, cache)
+    score = blend(costT, timeT, weights)
+    score = np.concatenate((score, score.min(axis=0)[np.newaxis]))
+    return np.stack([k_best(layer, k) for layer in score])
+
+
+def candidate_lists(index, layer="any"):
+    """Candidates of one layer as lists of city indexes, without the padding."""
+    return [[int(b) for b in row if b >= 0] for row in index[LAYERS.index(layer)]]
+
+
+def main():
+    argList = sys.argv[1:]
+    options = "hf:k:c:"
+    prefix = "./datasets/"
+    k = 10
+    cityN = None
+    try:
+        arguments, values = getopt.getopt(argList, options, "")
+        for arg, value in arguments:
+            if arg == "-h":
+                print("-f  Dataset prefix Default: ./datasets/\n-k Number of candidates per city Default: 10\n-c Nunber of cities Default: all")
+                exit()
+            elif arg == "-f":
+                prefix = value
+            elif arg == "-k":
+                k = int(value)
+            elif arg == "-c":
+                cityN = int(value)
+    except getopt.error as err:
+        print(str(err))
+
+    cities, _ = matrices.load_modes(prefix + "cost", cityN)
+    best_connections = candidate_lists(candidate_index(prefix, k, cityN), "plane")
+
+    repeated_connections = np.zeros(len(cities), dtype=int)
+    for city, best in zip(cities, best_connections):
+        repeated_connections[best] += 1
+        print([cities[b] for b in best])
+
+    print(50*"==")
+    for city, count in zip(cities, repeated_connections):
+        print(f"Rpeated {city}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Island model: several sub-populations evolving in their own processes.
+
+islands.run starts one process per island, each running a solver supplied
+target with an Island handle as first argument. Through it the island
+shares the evaluation budget with the others, sends its best individuals to
+its neighbour(s) and receives theirs, and finally reports its result.
+"""
+
+import multiprocessing as mp
+import queue
+import random
+
+
+class Island:
+    """
+    Handle given to the process running island index out of K.
+
+    Parameters:
+    - index: Number of this island, 0 to K-1.
+    - K: Number of islands.
+    - topology: "ring" sends migrants to the next island, "random" to a
+      randomly chosen other island every migration.
+    - inboxes: One queue per island where its immigrants arrive.
+    - counter: Shared count of evaluations spent by all islands.
+    - budget: Total evaluations for all islands together.
+    - results: Queue where the islands report their result.
+    """
+
+    def __init__(self, index, K, topology, inboxes, counter, budget, results):
+        self.index = index
+        self.K = K
+        self.topology = topology
+        self.inboxes = inboxes
+        self.counter = counter
+        self.budget = budget
+        self.results = results
+
+    def spend(self, evaluations):
+        """Add evaluations to the shared count, True while budget is left."""
+        with self.counter.get_lock():
+            self.counter.value += evaluations
+            return self.counter.value < self.budget
+
+    def left(self):
+        """Evaluations left in the shared budget."""
+        return self.budget - self.counter.value
+
+    def stop(self):
+        """Spend the rest of the budget, all the islands stop at their next spend."""
+        with self.counter.get_lock():
+            self.counter.value = max(self.counter.value, self.budget)
+
+    def emigrate(self, individuals):
+        """Send copies of individuals (genome and fitness) to the neighbour island."""
+        if self.topology == "random":
+            target = random.choice([i for i in range(self.K) if i != self.index])
+        else:
+            target = (self.index + 1) % self.K
+        self.inboxes[target].put([(list(ind), ind.fitness.values) for ind in individuals])
+
+    def immigrants(self):
+        """(genome, fitness) pairs received since the last call."""
+        arrived = []
+        while True:
+            try:
+                arrived.extend(self.inboxes[self.index].get_nowait())
+            except queue.Empty:
+                return arrived
+
+    def report(self, result):
+        # Migrants still on their way are dropped instead of blocking the exit
+        for inbox in self.inboxes:
+            inbox.cancel_join_thread()
+        self.results.put((self.index, result))
+
+
+def run(K, target, args=(), budget=10000, topology="ring"):
+    """
+    Run target(island, *args) on K islands and wait for them.
+
+    Returns:
+    - The results reported by the islands, ordered by island index.
+    """
+    inboxes = [mp.Queue() for _ in range(K)]
+    results = mp.Queue()
+    counter = mp.Value("l", 0)
+    processes = [mp.Process(target=target, args=(Island(i, K, topology, inboxes, counter, budget, results),) + tuple(args))
+                 for i in range(K)]
+    for process in processes:
+        process.start()
+
+    reported = {}
+    while len(reported) < K:
+        try:
+            index, result = results.get(timeout=1)
+            reported[index] = result
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes) and results.empty():
+                raise RuntimeError("an island process exited without reporting its result")
+    for process in processes:
+        process.join()
+    return [reported[i] for i in range(K)]
@@ -0,0 +1,193 @@
+"""
+Memetic local search: 2-opt and Or-opt on closed tours.
+
+The matrices are not symmetric (e.g. bus costs), so a 2-opt move also pays
+for the legs of the reversed segment; they are summed in O(1) from prefix
+sums of the forward and backward leg values along the tour. Missing links
+(inf) are respected by comparing tours on (number of missing legs, sum of the
+other legs), so a move never adds a missing leg unless it removes more.
+
+Candidate moves only add legs towards the k nearest cities of a city
+(neighbor_lists) and cities whose neighbourhood did not improve are not
+looked at again until one of their legs changes (don't-look bits), which
+keeps a pass close to linear in the number of cities.
+
+The partial evaluations of candidate moves are counted in leg lookups (4
+for a 2-opt move plus its O(1) reversed segment, 6 for an Or-opt move);
+len(tour) lookups are worth one evaluation, the cost of evaluating the tour
+from scratch. Updating the tour after an applied move is not counted.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+import heuristics
+
+INF = float("inf")
+
+
+def neighbor_lists(matrix, k=8):
+    """
+    k nearest cities of every city, by the cheaper direction of the link.
+
+    Cities without a link in either direction are never candidates.
+    """
+    matrix = np.asarray(matrix)
+    nearest = np.minimum(matrix, matrix.T)
+    np.fill_diagonal(nearest, np.inf)
+    return [[int(b) for b in row if b >= 0] for row in heuristics.k_best(nearest, k)]
+
+
+class _Tour:
+    # Tour with city positions and prefix sums of its forward/backward legs
+    # over two laps, so that any cyclic run of legs is summed in O(1)
+
+    def __init__(self, tour, matrix, rows):
+        self.t = list(tour)
+        self.matrix = matrix
+        self.rows = rows
+        self.n = len(self.t)
+        self.lookups = 0
+        self.rebuild()
+
+    def rebuild(self):
+        t = np.asarray(self.t)
+        nxt = np.roll(t, -1)
+        fwd = np.tile(self.matrix[t, nxt], 2)
+        bwd = np.tile(self.matrix[nxt, t], 2)
+        self.fwdFinite = np.concatenate(([0.0], np.cumsum(np.where(np.isfinite(fwd), fwd, 0.0)))).tolist()
+        self.fwdMissing = np.concatenate(([0], np.cumsum(~np.isfinite(fwd)))).tolist()
+        self.bwdFinite = np.concatenate(([0.0], np.cumsum(np.where(np.isfinite(bwd), bwd, 0.0)))).tolist()
+        self.bwdMissing = np.concatenate(([0], np.cumsum(~np.isfinite(bwd)))).tolist()
+        self.pos = [0] * self.n
+        for i, city in enumerate(self.t):
+            self.pos[city] = i
+
+    def value(self):
+        return self.fwdMissing[self.n], self.fwdFinite[self.n]
+
+    def leg(self, a, b):
+        self.lookups += 1
+        v = self.rows[a][b]
+        return (1, 0.0) if v == INF else (0, v)
+
+    def at(self, i):
+        return self.t[i % self.n]
+
+    def two_opt_delta(self, i, j):
+        # Replace legs i -> i+1 and j -> j+1 (j after i, unwrapped) by
+        # i -> j and i+1 -> j+1, reversing the cities i+1..j
+        a, b, c, d = self.at(i), self.at(i + 1), self.at(j), self.at(j + 1)
+        added = [self.leg(a, c), self.leg(b, d)]
+        removed = [self.leg(a, b), self.leg(c, d)]
+        missing = sum(m for m, v in added) - sum(m for m, v in removed)
+        finite = sum(v for m, v in added) - sum(v for m, v in removed)
+        lo, hi = i + 1, j
+        missing += (self.bwdMissing[hi] - self.bwdMissing[lo]) - (self.fwdMissing[hi] - self.fwdMissing[lo])
+        finite += (self.bwdFinite[hi] - self.bwdFinite[lo]) - (self.fwdFinite[hi] - self.fwdFinite[lo])
+        return missing, finite
+
+    def two_opt(self, i, j):
+        n = self.n
+        length = j - i
+        for k in range(length // 2):
+            p, q = (i + 1 + k) % n, (j - k) % n
+            self.t[p], self.t[q] = self.t[q], self.t[p]
+        self.rebuild()
+
+    def or_opt_delta(self, i, size, p):
+        # Move cities i..i+size-1 between p and p+1, keeping their order
+        prev, first, last, nxt = self.at(i - 1), self.at(i), self.at(i + size - 1), self.at(i + size)
+        c, d = self.at(p), self.at(p + 1)
+        added = [self.leg(prev, nxt), self.leg(c, first), self.leg(last, d)]
+        removed = [self.leg(prev, first), self.leg(last, nxt), self.leg(c, d)]
+        return sum(m for m, v in added) - sum(m for m, v in removed), \
+               sum(v for m, v in added) - sum(v for m, v in removed)
+
+    def or_opt(self, i, size, p):
+        n = self.n
+        segment = [self.at(i + k) for k in range(size)]
+        anchor = self.at(p)
+        rest = [self.at(i + size + k) for k in range(n - size)]
+        k = rest.index(anchor) + 1
+        self.t = rest[:k] + segment + rest[k:]
+        self.rebuild()
+
+
+def _improves(delta):
+    missing, finite = delta
+    return missing < 0 or (missing == 0 and finite < -1e-9)
+
+
+def improve(tour, matrix, neighbors, rows=None, maxMoves=None, maxEvaluations=None):
+    """
+    Apply improving 2-opt and Or-opt moves to a tour until none is left.
+
+    Parameters:
+    - tour: Sequence of city indexes, leg i ends at tour[i].
+    - matrix: (N, N) array of leg values, inf for missing links.
+    - neighbors: neighbor_lists(matrix).
+    - rows: matrix.tolist(), faster for single lookups, computed if not given.
+    - maxMoves: Optional limit on the number of moves applied.
+    - maxEvaluations: Optional limit on the evaluations the search is
+      worth, checked before each city is looked at (so exceeded by at most
+      the lookups of one city).
+
+    Returns:
+    - The improved tour (a new list, same rotation not guaranteed), its
+      value (inf if it still has a missing leg) and the number of
+      evaluations the search is worth.
+    """
+    if rows is None:
+        rows = np.asarray(matrix).tolist()
+    state = _Tour(tour, matrix, rows)
+    n = state.n
+    active = deque(state.t)
+    looking = set(state.t)
+    moves = 0
+
+    maxLookups = None if maxEvaluations is None else maxEvaluations * n
+    while active and (maxMoves is None or moves < maxMoves) and (maxLookups is None or state.lookups < maxLookups):
+        a = active.popleft()
+        looking.discard(a)
+        changed = None
+        i = state.pos[a]
+
+        for c in neighbors[a]:
+            j = state.pos[c]
+            # 2-opt adding the leg a -> c, from either side of a
+            for start, end in ((i, j), (i - 1, j - 1)):
+                length = (end - start) % n
+                if 2 <= length <= n - 2:
+                    if _improves(state.two_opt_delta(start, start + length)):
+                        changed = [state.at(start), state.at(start + 1), state.at(start + length), state.at(start + length + 1)]
+                        state.two_opt(start, start + length)
+                        break
+            if changed:
+                break
+
+            # Or-opt moving a run starting at a to just after c
+            for size in (1, 2, 3):
+                if size > n - 3:
+                    break
+                offset = (j - i) % n
+                if offset < size or offset == n - 1:
+                    continue
+                if _improves(state.or_opt_delta(i, size, j)):
+                    changed = [state.at(i - 1), state.at(i + size), c, state.at(j + 1), a, state.at(i + size - 1)]
+                    state.or_opt(i, size, j)
+                    break
+            if changed:
+                break
+
+        if changed:
+            moves += 1
+            for city in changed:
+                if city not in looking:
+                    looking.add(city)
+                    active.append(city)
+
+    missing, finite = state.value()
+    return state.t, (INF if missing else finite), math.ceil(state.lookups / n)
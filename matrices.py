@@ -0,0 +1,149 @@
+"""
+Loading of the cost/time matrices used by the solvers.
+
+The datasets are square CSV matrices with a header row of city names, one row
+per origin city and '-' for missing links. They are parsed once into float
+arrays (np.inf for missing links) and a binary copy is kept in a cache
+directory next to the CSV files, keyed by the hash of the CSV contents, so
+later runs memory-map the array instead of parsing the text again.
+"""
+
+import csv
+import hashlib
+import os
+
+import numpy as np
+
+MODES = ["train", "plane", "bus"]
+CACHE_DIR = "__matrixcache__"
+
+
+def read_matrix(csvName):
+    """
+    Parse one CSV matrix.
+
+    Returns the list of city names (header row) and a float64 array with
+    np.inf where the CSV has '-'.
+    """
+    with open(csvName, "r") as fp:
+        reader = csv.reader(fp)
+        cities = next(reader)[1:]
+        rows = [row[1:] for row in reader if row]
+
+    matrix = np.full((len(rows), len(cities)), np.inf)
+    for i, row in enumerate(rows):
+        for j, value in enumerate(row):
+            if value != "-":
+                matrix[i, j] = float(value)
+    return cities, matrix
+
+
+def _cache_key(csvNames):
+    digest = hashlib.sha1()
+    for csvName in csvNames:
+        with open(csvName, "rb") as fp:
+            digest.update(fp.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_tensor(csvNames, cityN=None, cache=True):
+    """
+    Load several CSV matrices as one (len(csvNames), cityN, cityN) array.
+
+    Parameters:
+    - csvNames: CSV files to stack, one per transport mode.
+    - cityN: Number of cities to keep (the first cityN rows/columns), all if None.
+    - cache: Read from/write to the binary cache next to the first CSV file.
+
+    Returns:
+    - The list of city names and the (read only when cached) float tensor.
+    """
+    tensor = None
+    cities = None
+    if cache:
+        cacheDir = os.path.join(os.path.dirname(os.path.abspath(csvNames[0])), CACHE_DIR)
+        key = _cache_key(csvNames)
+        arrayPath = os.path.join(cacheDir, key + ".npy")
+        citiesPath = os.path.join(cacheDir, key + ".cities")
+        try:
+            tensor = np.load(arrayPath, mmap_mode="r")
+            with open(citiesPath, "r") as fp:
+                cities = fp.read().split("\n")
+        except (OSError, ValueError):
+            tensor = None
+
+    if tensor is None:
+        matrices = []
+        for csvName in csvNames:
+            cities, matrix = read_matrix(csvName)
+            matrices.append(matrix)
+        tensor = np.stack(matrices)
+
+        if cache:
+            try:
+                os.makedirs(cacheDir, exist_ok=True)
+                # Write to a temporary name first so a concurrent run never
+                # maps a half written file
+                tmpPath = "%s.%d.tmp" % (arrayPath, os.getpid())
+                with open(tmpPath, "wb") as fp:
+                    np.save(fp, tensor)
+                os.replace(tmpPath, arrayPath)
+                with open(citiesPath, "w") as fp:
+                    fp.write("\n".join(cities))
+            except OSError:
+                pass
+
+    if cityN is not None:
+        cities = cities[:cityN]
+        tensor = tensor[:, :cityN, :cityN]
+    return cities, tensor
+
+
+def load_modes(prefix, cityN=None, cache=True):
+    """
+    Load the train/plane/bus matrices named prefix + mode + '.csv'.
+
+    e.g. load_modes("datasets/cost") reads datasets/costtrain.csv,
+    datasets/costplane.csv and datasets/costbus.csv.
+    """
+    return load_tensor([prefix + mode + ".csv" for mode in MODES], cityN, cache)
+
+
+def max_finite(tensor):
+    """Largest finite value of a tensor, 0.0 if there is none."""
+    finite = np.asarray(tensor)[np.isfinite(tensor)]
+    return float(finite.max()) if finite.size else 0.0
+
+
+def cached(csvNames, tag, build, cache=True):
+    """
+    Array derived from CSV files, kept in the same cache as the matrices.
+
+    Parameters:
+    - csvNames: CSV files the array is computed from.
+    - tag: Name of the array and of the parameters it was built with.
+    - build: Function computing the array when it is not cached.
+
+    Returns:
+    - The (read only when cached) array.
+    """
+    if not cache:
+        return build()
+    cacheDir = os.path.join(os.path.dirname(os.path.abspath(csvNames[0])), CACHE_DIR)
+    arrayPath = os.path.join(cacheDir, "%s.%s.npy" % (_cache_key(csvNames), tag))
+    try:
+        return np.load(arrayPath, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+
+    array = build()
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        tmpPath = "%s.%d.tmp" % (arrayPath, os.getpid())
+        with open(tmpPath, "wb") as fp:
+            np.save(fp, array)
+        os.replace(tmpPath, arrayPath)
+    except OSError:
+        pass
+    return array
@@ -0,0 +1,316 @@
+"""
+Bi-objective helpers for the multi-objective solver.
+
+Both objectives are minimized and the hypervolume is measured against a
+reference point (the limits computed by evolutionaryMO.py): the area
+dominated by the points and bounded by the reference point.
+"""
+
+import copy
+import random
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+def hypervolume(points, ref):
+    """
+    Exact hypervolume of a set of bi-objective points.
+
+    Parameters:
+    - points: Sequence or (n, 2) array of (f1, f2) points, dominated points allowed.
+    - ref: (r1, r2) reference point, points not strictly better in both
+      objectives contribute nothing.
+
+    Returns:
+    - Hypervolume value, in O(n log n).
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    points = points[(points[:, 0] < ref[0]) & (points[:, 1] < ref[1])]
+    if len(points) == 0:
+        return 0.0
+
+    # Sweep by increasing f1 (ties by f2), each point that improves the
+    # best f2 seen so far adds a rectangle up to the reference point
+    points = points[np.lexsort((points[:, 1], points[:, 0]))]
+    hv = 0.0
+    bestY = ref[1]
+    for x, y in points.tolist():
+        if y < bestY:
+            hv += (ref[0] - x) * (bestY - y)
+            bestY = y
+    return hv
+
+
+class IncrementalHypervolume:
+    """
+    Hypervolume of a growing/shrinking non-dominated set.
+
+    The non-dominated points are kept sorted by f1 (so by decreasing f2) and
+    the value is updated from the neighbours of each inserted or removed
+    point, with a binary search to find them.
+
+    Parameters:
+    - ref: (r1, r2) reference point.
+    """
+
+    def __init__(self, ref):
+        self.ref = (float(ref[0]), float(ref[1]))
+        self.xs = []
+        self.ys = []
+        self.value = 0.0
+
+    def __len__(self):
+        return len(self.xs)
+
+    def points(self):
+        """The non-dominated points as an (n, 2) array sorted by f1."""
+        return np.column_stack((self.xs, self.ys)).reshape(-1, 2)
+
+    def _slab(self, k):
+        # Area between point k and the next point (or the reference) in f1
+        nextX = self.xs[k + 1] if k + 1 < len(self.xs) else self.ref[0]
+        return (nextX - self.xs[k]) * (self.ref[1] - self.ys[k])
+
+    def add(self, point):
+        """
+        Insert a point, dropping the points it dominates.
+
+        Returns:
+        - False if the point is dominated (or outside the reference box) and
+          nothing changed, True otherwise.
+        """
+        x, y = float(point[0]), float(point[1])
+        if not (x < self.ref[0] and y < self.ref[1]):
+            return False
+        xs, ys = self.xs, self.ys
+        k = bisect_left(xs, x)
+        if (k > 0 and ys[k - 1] <= y) or (k < len(xs) and xs[k] == x and ys[k] <= y):
+            return False
+
+        m = k
+        while m < len(xs) and ys[m] >= y:
+            m += 1
+
+        old = sum(self._slab(j) for j in range(k, m))
+        if k > 0:
+            old += self._slab(k - 1)
+        del xs[k:m], ys[k:m]
+        xs.insert(k, x)
+        ys.insert(k, y)
+        new = self._slab(k)
+        if k > 0:
+            new += self._slab(k - 1)
+
+        self.value += new - old
+        return True
+
+    def remove(self, point):
+        """Remove a point of the set, the area only it dominated is lost."""
+        x, y = float(point[0]), float(point[1])
+        k = bisect_left(self.xs, x)
+        if k == len(self.xs) or self.xs[k] != x or self.ys[k] != y:
+            raise ValueError("%s is not in the non-dominated set" % (point,))
+
+        old = self._slab(k)
+        if k > 0:
+            old += self._slab(k - 1)
+        del self.xs[k], self.ys[k]
+        new = self._slab(k - 1) if k > 0 else 0.0
+
+        self.value += new - old
+
+
+class ParetoArchive:
+    """
+    Archive of the non-dominated individuals found so far.
+
+    Replaces tools.ParetoFront for two minimized objectives: the individuals
+    are kept sorted by the first objective (so by decreasing second
+    objective), a candidate is checked against its neighbours only, found by
+    binary search, and the ones it dominates are next to where it goes.
+
+    Parameters:
+    - ref: Optional reference point, the hypervolume of the archive is then
+      kept up to date in self.hypervolume.
+    - epsilon: Optional (e1, e2) grid, at most one individual is kept per
+      grid box and boxes dominated by another box are dropped.
+    - maxsize: Optional cap, past it the individual with the smallest
+      exclusive hypervolume contribution (never an extreme) is dropped.
+    """
+
+    def __init__(self, ref=None, epsilon=None, maxsize=None):
+        self.epsilon = epsilon
+        self.maxsize = maxsize
+        self.keys = []
+        self.xs = []
+        self.ys = []
+        self.items = []
+        self.hv = IncrementalHypervolume(ref) if ref is not None else None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    @property
+    def hypervolume(self):
+        if self.hv is None:
+            raise ValueError("the archive has no reference point, pass ref to ParetoArchive or use moea.hypervolume")
+        return self.hv.value
+
+    def points(self):
+        """The (cost, time) of the archive as an (n, 2) array sorted by cost."""
+        return np.column_stack((self.xs, self.ys)).reshape(-1, 2)
+
+    def _key(self, x, y):
+        if self.epsilon is None:
+            return (x, y)
+        return (np.floor(x / self.epsilon[0]), np.floor(y / self.epsilon[1]))
+
+    def update(self, population):
+        """Insert every individual of population, as ParetoFront.update."""
+        for ind in population:
+            self.insert(ind)
+
+    def insert(self, ind):
+        """Insert a copy of ind if it is not dominated, True if it was."""
+        x, y = ind.fitness.values
+        if not (np.isfinite(x) and np.isfinite(y)):
+            return False
+        kx, ky = self._key(x, y)
+        keys = self.keys
+        k = bisect_left(keys, (kx, -np.inf))
+
+        replace = 0
+        if k > 0 and keys[k - 1][1] <= ky:
+            return False
+        if k < len(keys) and keys[k][0] == kx and keys[k][1] <= ky:
+            if keys[k][1] < ky or self.epsilon is None:
+                return False
+            # Same box: the point closest to the box corner stays
+            oldX, oldY = self.xs[k], self.ys[k]
+            corner = (kx * self.epsilon[0], ky * self.epsilon[1])
+            if not (x <= oldX and y <= oldY) and (x - corner[0]) ** 2 + (y - corner[1]) ** 2 >= (oldX - corner[0]) ** 2 + (oldY - corner[1]) ** 2:
+                return False
+            replace = 1
+
+        m = k + replace
+        while m < len(keys) and keys[m][1] >= ky:
+            m += 1
+        for j in range(k, m):
+            self._forget(self.xs[j], self.ys[j])
+        del keys[k:m], self.xs[k:m], self.ys[k:m], self.items[k:m]
+
+        keys.insert(k, (kx, ky))
+        self.xs.insert(k, x)
+        self.ys.insert(k, y)
+        self.items.insert(k, copy.deepcopy(ind))
+        if self.hv is not None:
+            self.hv.add((x, y))
+
+        if self.maxsize is not None and len(keys) > self.maxsize:
+            self._shrink()
+        return True
+
+    def _forget(self, x, y):
+        if self.hv is not None and x < self.hv.ref[0] and y < self.hv.ref[1]:
+            self.hv.remove((x, y))
+
+    def _shrink(self):
+        xs, ys = self.xs, self.ys
+        if len(xs) < 3:
+            return
+        contributions = [(xs[k + 1] - xs[k]) * (ys[k - 1] - ys[k]) for k in range(1, len(xs) - 1)]
+        k = 1 + int(np.argmin(contributions))
+        self._forget(xs[k], ys[k])
+        del self.keys[k], xs[k], ys[k], self.items[k]
+
+
+def rank_nondominated(points):
+    """
+    Non-domination rank of bi-objective points (0 for the first front).
+
+    Sweep by increasing (f1, f2): each point goes to the first front whose
+    last point does not dominate it, the last f2 of the fronts being
+    non-decreasing it is found by binary search, O(n log n) in total.
+    Identical points share their rank.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    ranks = np.empty(len(points), dtype=int)
+    lastY = []
+    previous = None
+    for i in order.tolist():
+        point = (points[i, 0], points[i, 1])
+        if point == previous:
+            ranks[i] = rank
+            continue
+        rank = bisect_right(lastY, point[1])
+        if rank == len(lastY):
+            lastY.append(point[1])
+        else:
+            lastY[rank] = point[1]
+        ranks[i] = rank
+        previous = point
+    return ranks
+
+
+def crowding_distance(points, ranks):
+    """Crowding distance of each point within its front, inf for the extremes."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    distances = np.zeros(len(points))
+    for rank in np.unique(ranks):
+        front = np.flatnonzero(ranks == rank)
+        for m in range(2):
+            values = points[front, m]
+            order = front[np.argsort(values, kind="stable")]
+            low, high = points[order[0], m], points[order[-1], m]
+            distances[order[0]] = distances[order[-1]] = np.inf
+            if len(order) > 2 and np.isfinite(high) and high > low:
+                # normalized as tools.emo.assignCrowdingDist
+                distances[order[1:-1]] += (points[order[2:], m] - points[order[:-2], m]) / (2 * (high - low))
+    return distances
+
+
+def assign_ranks(individuals):
+    """
+    Store the rank and crowding distance of individuals on them.
+
+    The one non-dominated sort of a generation, selRanked and
+    selCrowdedTournament then reuse what it stored.
+
+    Returns:
+    - The individuals of the first front.
+    """
+    points = [ind.fitness.values for ind in individuals]
+    ranks = rank_nondominated(points)
+    distances = crowding_distance(points, ranks)
+    for ind, rank, distance in zip(individuals, ranks.tolist(), distances.tolist()):
+        ind.rank = rank
+        ind.crowding = distance
+    return [ind for ind in individuals if ind.rank == 0]
+
+
+def selRanked(individuals, k):
+    """NSGA-II truncation by rank then crowding distance, as stored by assign_ranks."""
+    return sorted(individuals, key=lambda ind: (ind.rank, -ind.crowding))[:k]
+
+
+def selCrowdedTournament(individuals, k):
+    """
+    k crowded binary tournaments: the lower rank wins, then the larger
+    crowding distance, then a coin flip.
+    """
+    chosen = []
+    for i in range(k):
+        a, b = random.sample(individuals, 2)
+        if (a.rank, -a.crowding) > (b.rank, -b.crowding) or \
+                ((a.rank, a.crowding) == (b.rank, b.crowding) and random.random() < 0.5):
+            a = b
+        chosen.append(a)
+    return chosen
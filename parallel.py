@@ -0,0 +1,80 @@
+"""
+Parallel batch evaluation over a process pool.
+
+The cost/time matrices are copied once into shared memory blocks that the
+worker processes attach to when they start, so only the (small) integer
+tour and mode matrices travel to the workers with each task. A batch is
+split into a few chunks, at most one per worker, so that the inter-process
+overhead stays small next to the evaluation itself.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import evaluation
+
+# Matrices attached by a worker process
+_matrices = None
+_blocks = None
+
+
+def _attach(specs):
+    global _matrices, _blocks
+    _blocks = [shared_memory.SharedMemory(name=name) for name, shape, dtype in specs]
+    _matrices = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                 for block, (name, shape, dtype) in zip(_blocks, specs)]
+
+
+def _evaluate_chunk(tours, modes):
+    return np.stack([evaluation.tour_cost(matrix, tours, modes) for matrix in _matrices])
+
+
+class PoolEvaluator:
+    """
+    Evaluate batches of tours on a ProcessPoolExecutor.
+
+    Parameters:
+    - matrices: One matrix per objective, shared with the workers.
+    - workers: Number of worker processes, all cores if None.
+    - minChunk: Smallest number of tours sent to a worker in one task.
+
+    Calling the evaluator with a (P, N) tour matrix (and a (P, N) mode matrix
+    for the transport genomes) returns an (objectives, P) array.
+    """
+
+    def __init__(self, matrices, workers=None, minChunk=16):
+        self.workers = workers or os.cpu_count() or 1
+        self.minChunk = minChunk
+        self.blocks = []
+        specs = []
+        for matrix in matrices:
+            matrix = np.ascontiguousarray(matrix)
+            block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+            np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=block.buf)[...] = matrix
+            self.blocks.append(block)
+            specs.append((block.name, matrix.shape, matrix.dtype.str))
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(specs,))
+
+    def __call__(self, tours, modes=None):
+        chunks = max(1, min(self.workers, math.ceil(len(tours) / self.minChunk)))
+        bounds = np.linspace(0, len(tours), chunks + 1).astype(int)
+        futures = [self.executor.submit(_evaluate_chunk, tours[a:b], None if modes is None else modes[a:b])
+                   for a, b in zip(bounds[:-1], bounds[1:])]
+        return np.concatenate([future.result() for future in futures], axis=1)
+
+    def close(self):
+        self.executor.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,87 @@
+"""
+Problem instances of the solvers.
+
+A Problem holds the cities of an instance and its cost (and time) tensors,
+loaded once from the datasets. The solvers take it instead of reading the
+matrices into module globals, so several instances (or several runs of the
+same one) can be solved from one process:
+
+    problem = problems.Problem.transport("datasets/time", cityN=30)
+    result = evolutionaryTransport.solve(problem, popN=100, seed=1)
+
+The tensors are indexed [transport, origin, destination] with np.inf for
+missing links; the TSP instances have a single transport.
+"""
+
+import numpy as np
+
+import connections
+import matrices
+
+
+class Problem:
+    """
+    One instance: its cities and matrices.
+
+    Parameters:
+    - cities: Names of the cities.
+    - cost: (modes, N, N) cost tensor.
+    - time: Optional (modes, N, N) time tensor, for the bi-objective solver.
+    - ref: Reference point of the hypervolume, (cost, time) of the worst
+      tour on direct links, for the bi-objective solver.
+    - paths: Layover paths of the transports past the train, plane and bus
+      (see connections.py), None without them.
+    """
+
+    def __init__(self, cities, cost, time=None, ref=None, paths=None):
+        self.cities = cities
+        self.cost = cost
+        self.time = time
+        self.ref = ref
+        self.paths = paths
+
+    @property
+    def cityN(self):
+        return len(self.cities)
+
+    @property
+    def modeN(self):
+        return len(self.cost)
+
+    @classmethod
+    def tsp(cls, csvName="timetrain.csv", cityN=None):
+        """The single matrix of csvName, for evolutionary.py."""
+        cities, costM = matrices.load_tensor([csvName], cityN)
+        return cls(cities, costM)
+
+    @classmethod
+    def transport(cls, prefix="time", cityN=None):
+        """The train/plane/bus matrices prefix + mode + ".csv", for evolutionaryTransport.py."""
+        cities, costM = matrices.load_modes(prefix, cityN)
+        return cls(cities, costM)
+
+    @classmethod
+    def biobjective(cls, prefix="", cityN=None, connectionN=0):
+        """
+        The cost and time matrices prefix + "cost"/"time" + mode + ".csv",
+        for evolutionaryMO.py.
+
+        Parameters:
+        - connectionN: Non-dominated layover connections per pair of cities
+          added as extra transports, 0 for none.
+        """
+        cities, costM = matrices.load_modes(prefix + "cost", cityN)
+        cities, timeM = matrices.load_modes(prefix + "time", cityN)
+        # the reference point stays that of the direct links
+        ref = [matrices.max_finite(costM) * len(cities), matrices.max_finite(timeM) * len(cities)]
+        # a link without a cost or without a time does not exist, a tour using
+        # it is (inf, inf) and not half feasible; the layover routes replace it
+        missing = ~(np.isfinite(costM) & np.isfinite(timeM))
+        costM = np.where(missing, np.inf, costM)
+        timeM = np.where(missing, np.inf, timeM)
+        paths = None
+        if connectionN > 0:
+            connectionCost, connectionTime, paths = connections.load(prefix, cityN, connectionN)
+            costM = np.concatenate((costM, connectionCost))
+            timeM = np.concatenate((timeM, connectionTime))
+        return cls(cities, costM, timeM, ref, paths)
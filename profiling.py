@@ -0,0 +1,150 @@
+"""
+Opt-in timers and counters for the phases of the generation loop.
+
+The solvers time each phase of a generation (select, clone, mate, mutate,
+evaluate, ...) and count what happens in it (evaluations, cache hits, inf
+results, clones, sorts):
+
+    with profiler.phase("evaluate"):
+        fitnesses = toolbox.evaluatePop(invalid_ind)
+    profiler.count("evaluations", len(invalid_ind))
+    profiler.next_generation(g)
+
+A disabled run uses NullProfiler, whose methods do nothing. At the end,
+summary() gives the totals and write() saves the per-generation trace as a
+CSV table and the totals as folded stacks ("solver;generation;evaluate 1234",
+in microseconds, "solver;setup;..." before the first generation), the input
+of flamegraph.pl and speedscope.
+"""
+
+import csv
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+
+
+class Profiler:
+    """
+    Phase times and counters, aggregated per generation.
+
+    Parameters:
+    - name: Root of the folded stacks, usually the solver.
+    """
+
+    def __init__(self, name="solver"):
+        self.name = name
+        self.phases = []
+        self.counters = []
+        self.current = {}
+        self.counts = {}
+        self.generation = 0
+        self.trace = []
+
+    def phase(self, name):
+        """Context manager adding the time spent in it to phase name."""
+        if name not in self.phases:
+            self.phases.append(name)
+        return _Timer(self, name)
+
+    def count(self, name, n=1):
+        """Add n to counter name."""
+        if name not in self.counters:
+            self.counters.append(name)
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def counted(self, name, function):
+        """function, counting its calls in counter name."""
+        def wrapper(*args, **kargs):
+            self.count(name)
+            return function(*args, **kargs)
+        return wrapper
+
+    def next_generation(self, g=None):
+        """Close the row of the current generation (the setup phases are generation 0)."""
+        self.trace.append((self.generation, self.current, self.counts))
+        self.generation = self.generation + 1 if g is None else g + 1
+        self.current = {}
+        self.counts = {}
+
+    def _rows(self):
+        rows = list(self.trace)
+        if self.current or self.counts:
+            rows.append((self.generation, self.current, self.counts))
+        return rows
+
+    def summary(self):
+        """Totals: {"phases": {name: seconds}, "counters": {name: total}, "generations": n}."""
+        rows = self._rows()
+        return {
+            "phases": {name: sum(times.get(name, 0.0) for g, times, counts in rows) for name in self.phases},
+            "counters": {name: sum(counts.get(name, 0) for g, times, counts in rows) for name in self.counters},
+            "generations": sum(1 for g, times, counts in rows if g > 0),
+        }
+
+    def report(self, out=sys.stderr):
+        """Print the summary as a table, by default on stderr."""
+        summary = self.summary()
+        generations = max(summary["generations"], 1)
+        total = sum(summary["phases"].values()) or 1.0
+        print("%-12s %10s %7s %12s" % ("phase", "seconds", "%", "us/gen"), file=out)
+        for name, seconds in sorted(summary["phases"].items(), key=lambda item: -item[1]):
+            print("%-12s %10.4f %6.1f%% %12.1f" % (name, seconds, 100 * seconds / total, 1e6 * seconds / generations), file=out)
+        print("%-12s %10s %12s" % ("counter", "total", "per gen"), file=out)
+        for name, value in summary["counters"].items():
+            print("%-12s %10i %12.1f" % (name, value, value / generations), file=out)
+
+    def write(self, path):
+        """
+        Save the per-generation trace to path (CSV, one row per generation,
+        one column per phase in seconds then per counter) and the totals as
+        folded stacks to path with a .folded extension.
+        """
+        with open(path, "w", newline="") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(["g"] + self.phases + self.counters)
+            for g, times, counts in self._rows():
+                writer.writerow([g] + ["%.9f" % times.get(name, 0.0) for name in self.phases] +
+                                [counts.get(name, 0) for name in self.counters])
+
+        # Generation 0 holds the setup phases, before the first generation
+        rows = self._rows()
+        frames = (("setup", [r for r in rows if r[0] == 0]), ("generation", [r for r in rows if r[0] > 0]))
+        with open(os.path.splitext(path)[0] + ".folded", "w") as fp:
+            for name in self.phases:
+                for frame, frameRows in frames:
+                    seconds = sum(times.get(name, 0.0) for g, times, counts in frameRows)
+                    if seconds > 0:
+                        fp.write("%s;%s;%s %i\n" % (self.name, frame, name, round(1e6 * seconds)))
+
+
+class NullProfiler:
+    """Profiler interface doing nothing, for runs without profiling."""
+
+    def phase(self, name):
+        return nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+    def counted(self, name, function):
+        return function
+
+    def next_generation(self, g=None):
+        pass
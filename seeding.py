@@ -0,0 +1,159 @@
+"""
+Construction heuristics to seed the initial population.
+
+- nearest_neighbour: from a start city, always go to the nearest unvisited
+  city, looked up in the candidate lists first (heuristics.k_best).
+- greedy_edge: add the cheapest links that keep every city with at most one
+  arrival and one departure and close no early cycle, then join the pieces.
+- space_filling_curve: visit the cities in the order of a Hilbert curve over
+  their coordinates in xy.csv.
+
+seed_tours mixes them into the requested number of tours; the solvers fill
+the rest of the population with random tours to keep diversity.
+"""
+
+import csv
+import random
+
+import numpy as np
+
+import heuristics
+
+
+def nearest_neighbour(matrix, start, candidates=None):
+    """Nearest neighbour tour of matrix (inf for missing links) from start."""
+    matrix = np.asarray(matrix)
+    n = len(matrix)
+    visited = np.zeros(n, dtype=bool)
+    tour = [start]
+    visited[start] = True
+    for step in range(n - 1):
+        current = tour[-1]
+        nxt = -1
+        if candidates is not None:
+            for b in candidates[current]:
+                if b >= 0 and not visited[b]:
+                    nxt = int(b)
+                    break
+        if nxt < 0:
+            row = np.where(visited, np.inf, matrix[current])
+            nxt = int(np.argmin(row)) if np.isfinite(row).any() else int(np.flatnonzero(~visited)[0])
+        tour.append(nxt)
+        visited[nxt] = True
+    return tour
+
+
+def greedy_edge(matrix):
+    """Greedy edge tour of matrix, the links taken by increasing value."""
+    matrix = np.asarray(matrix)
+    n = len(matrix)
+    successor = [-1] * n
+    predecessor = [-1] * n
+    group = list(range(n))
+
+    def find(a):
+        while group[a] != a:
+            group[a] = group[group[a]]
+            a = group[a]
+        return a
+
+    origins, destinations = np.nonzero(np.isfinite(matrix) & ~np.eye(n, dtype=bool))
+    order = np.argsort(matrix[origins, destinations], kind="stable")
+    added = 0
+    for a, b in zip(origins[order].tolist(), destinations[order].tolist()):
+        if successor[a] >= 0 or predecessor[b] >= 0 or find(a) == find(b):
+            continue
+        successor[a] = b
+        predecessor[b] = a
+        group[find(a)] = find(b)
+        added += 1
+        if added == n - 1:
+            break
+
+    # Join the paths (a single one unless links were missing) into a tour,
+    # each time with the path whose first city is the nearest
+    paths = []
+    for start in range(n):
+        if predecessor[start] < 0:
+            path = []
+            city = start
+            while city >= 0:
+                path.append(city)
+                city = successor[city]
+            paths.append(path)
+    tour = paths.pop(0)
+    while paths:
+        k = int(np.argmin([matrix[tour[-1], path[0]] for path in paths]))
+        tour += paths.pop(k)
+    return tour
+
+
+def read_coordinates(xyName, cities):
+    """(len(cities), 2) array of (longitude, latitude) from xy.csv, nan if missing."""
+    coordinates = {}
+    with open(xyName, "r") as fp:
+        reader = csv.DictReader(fp)
+        for row in reader:
+            coordinates[row["City"]] = (float(row["Longitude"]), float(row["Latitude"]))
+    return np.array([coordinates.get(city, (np.nan, np.nan)) for city in cities])
+
+
+def hilbert_index(x, y, order=16):
+    """Position of integer point (x, y) of a 2**order grid along the Hilbert curve."""
+    d = 0
+    s = 1 << (order - 1)
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def space_filling_curve(coordinates, order=16):
+    """Tour visiting the points in Hilbert curve order, points without coordinates last."""
+    coordinates = np.asarray(coordinates, dtype=float)
+    known = np.isfinite(coordinates).all(axis=1)
+    if not known.any():
+        return list(range(len(coordinates)))
+    low = coordinates[known].min(axis=0)
+    span = np.maximum(coordinates[known].max(axis=0) - low, 1e-9)
+    grid = ((coordinates[known] - low) / span * ((1 << order) - 1)).astype(int)
+    keys = [hilbert_index(int(x), int(y), order) for x, y in grid]
+    ordered = np.flatnonzero(known)[np.argsort(keys, kind="stable")]
+    return ordered.tolist() + np.flatnonzero(~known).tolist()
+
+
+def seed_tours(count, matrix, coordinates=None, k=10):
+    """
+    count tours built with the heuristics.
+
+    The greedy edge and space filling curve tours (when coordinates are
+    given) come first, then nearest neighbour tours from distinct random
+    start cities; past one per start city, nearest neighbour tours get a few
+    random swaps so that the seeds stay distinct.
+    """
+    if count <= 0:
+        return []
+    matrix = np.asarray(matrix)
+    n = len(matrix)
+    candidates = heuristics.k_best(matrix, k)
+
+    tours = [greedy_edge(matrix)]
+    if coordinates is not None:
+        tours.append(space_filling_curve(coordinates))
+    starts = random.sample(range(n), n)
+    while len(tours) < count:
+        start = starts[(len(tours)) % n]
+        tour = nearest_neighbour(matrix, start, candidates)
+        if len(tours) >= n:
+            for swap in range(max(1, n // 20)):
+                i, j = random.sample(range(n), 2)
+                tour[i], tour[j] = tour[j], tour[i]
+        tours.append(tour)
+    return tours[:count]
@@ -0,0 +1,160 @@
+"""
+Headless progress telemetry for the solvers.
+
+A Telemetry object streams JSON lines (one record per line) to a file, or
+to stdout with "-". Records are handed to a writer thread, so the
+optimization loop never waits on the disk, a slow pipe or a plot:
+
+    {"type": "generation", "g": 1, "evaluations": 150, "time": 0.02, ...}
+    {"type": "front", "g": 10, "population": [[cost, time], ...], "archive": [...]}
+    {"type": "end", "g": 200, "evaluations": 10000, "time": 3.1, "phases": {"load": 0.1, ...}, ...}
+
+Running this module starts a viewer that follows such a file and renders
+it live with matplotlib, in its own process:
+
+    python telemetry.py run.jsonl
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import queue
+
+
+class Telemetry:
+    """
+    Stream records to path ("-" for stdout) from a background thread.
+
+    Parameters:
+    - path: Output file (created or truncated), "-" for stdout.
+    - start: time.perf_counter() the times are relative to, now if None;
+      the time until the first phase() call is the "load" phase.
+    """
+
+    def __init__(self, path, start=None):
+        self.path = path
+        self.start = time.perf_counter() if start is None else start
+        self.phases = {}
+        self.current = "load"
+        self.phaseStart = self.start
+        self.records = queue.SimpleQueue()
+        self.fp = sys.stdout if path == "-" else open(path, "w")
+        self.thread = threading.Thread(target=self._write, daemon=True)
+        self.thread.start()
+
+    def _write(self):
+        while True:
+            line = self.records.get()
+            if line is None:
+                break
+            self.fp.write(line + "\n")
+            self.fp.flush()
+
+    def write(self, kind, **data):
+        """Queue one record of the given type, stamped with the elapsed time."""
+        data = dict(type=kind, time=time.perf_counter() - self.start, **data)
+        self.records.put(json.dumps(data))
+
+    def generation(self, g, evaluations, **metrics):
+        self.write("generation", g=g, evaluations=evaluations, **metrics)
+
+    def phase(self, name):
+        """End the current phase and start timing phase name."""
+        now = time.perf_counter()
+        self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.phaseStart
+        self.current, self.phaseStart = name, now
+
+    def front(self, g, population, archive=None):
+        """Snapshot of (cost, time) points, arrays or lists of pairs."""
+        self.write("front", g=g, population=_pairs(population),
+                   archive=None if archive is None else _pairs(archive))
+
+    def close(self, **summary):
+        """Write the end record, with the phase times, and wait for everything to be written."""
+        self.phase(None)
+        self.write("end", phases=self.phases, **summary)
+        self.records.put(None)
+        self.thread.join()
+        if self.fp is not sys.stdout:
+            self.fp.close()
+
+
+def _pairs(points):
+    return [[float(x), float(y)] for x, y in points]
+
+
+def start_viewer(path):
+    """Start the live viewer of path in a separate process."""
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), path])
+
+
+def follow(path, poll=0.2):
+    """Yield the records of path as they are written, until the end record."""
+    while not os.path.exists(path):
+        time.sleep(poll)
+    with open(path, "r") as fp:
+        pending = ""
+        while True:
+            line = fp.readline()
+            if not line:
+                time.sleep(poll)
+                continue
+            pending += line
+            if not pending.endswith("\n"):
+                continue
+            record = json.loads(pending)
+            pending = ""
+            yield record
+            if record["type"] == "end":
+                return
+
+
+def view(path):
+    """Render the records of path live: the fronts and the progress metrics."""
+    import matplotlib.pyplot as plt
+
+    fig, (axFront, axProgress) = plt.subplots(1, 2, figsize=(12, 5))
+    evaluations = []
+    metrics = {}
+    last = 0.0
+    for record in follow(path):
+        if record["type"] == "generation":
+            evaluations.append(record["evaluations"])
+            for name, value in record.items():
+                if name not in ("type", "g", "evaluations", "time") and isinstance(value, (int, float)):
+                    metrics.setdefault(name, []).append(value)
+        elif record["type"] == "front":
+            axFront.clear()
+            if record.get("archive"):
+                axFront.scatter(*zip(*record["archive"]), c='blue', label='Pareto Front')
+            if record["population"]:
+                axFront.scatter(*zip(*record["population"]), c='red', label='Current pop Pareto Front')
+            axFront.set_title('Pareto Front (generation %i)' % record["g"])
+            axFront.set_xlabel('Cost (f1)')
+            axFront.set_ylabel('Time (f2)')
+            axFront.legend()
+            axFront.grid()
+
+        # Redraw at most a few times per second however fast records come
+        if time.monotonic() - last > 0.5 or record["type"] == "end":
+            axProgress.clear()
+            for name, values in metrics.items():
+                axProgress.plot(evaluations[:len(values)], values, label=name)
+            axProgress.set_xlabel('Evaluations')
+            if metrics:
+                axProgress.legend()
+            axProgress.grid()
+            plt.pause(0.01)
+            last = time.monotonic()
+
+    plt.show()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python telemetry.py <telemetry file>")
+        sys.exit(1)
+    view(sys.argv[1])
@@ -0,0 +1,102 @@
+"""
+When to stop a run.
+
+A Termination combines any of these criteria, the first one met stops the
+run and is kept in its reason:
+
+- "target": the quality reached a target (best cost at most the target, or
+  hypervolume at least the target),
+- "evaluations": the evaluation budget is spent (10000 by default, the
+  budget the solvers always had),
+- "time": the wall-clock limit is reached,
+- "stagnation": the best quality did not improve by more than a tolerance
+  in the last window generations.
+
+The solvers check it once per generation with the quality of the
+population:
+
+    stop = termination.Termination(evaluations=10000, seconds=60, window=50)
+    while not stop.done(e, min(fits)):
+        ...
+    print("Stopped by %s" % stop.reason)
+"""
+
+import time
+
+
+class Termination:
+    """
+    Stop criteria of a run, None for those not used.
+
+    Parameters:
+    - evaluations: Evaluation budget.
+    - seconds: Wall-clock limit.
+    - target: Quality to reach.
+    - window: Generations without improvement before stopping.
+    - tolerance: Smallest improvement for window, a fraction of the best
+      quality so far (0 for any improvement).
+    - maximize: True when the quality is maximized (hypervolume), False when
+      it is minimized (cost).
+    """
+
+    def __init__(self, evaluations=10000, seconds=None, target=None, window=None, tolerance=0.0, maximize=False):
+        self.evaluations = evaluations
+        self.seconds = seconds
+        self.target = target
+        self.window = window
+        self.tolerance = tolerance
+        self.maximize = maximize
+        self.start = time.monotonic()
+        self.previous = 0.0
+        self.best = None
+        self.stalled = 0
+        self.reason = None
+
+    def elapsed(self):
+        """Seconds spent in the run, those before a resume included."""
+        return self.previous + time.monotonic() - self.start
+
+    def _improves(self, quality):
+        if self.best is None:
+            return True
+        gain = quality - self.best if self.maximize else self.best - quality
+        return gain == float("inf") or gain > self.tolerance * abs(self.best)
+
+    def done(self, e, quality=None):
+        """
+        Check the criteria after a generation.
+
+        Parameters:
+        - e: Evaluations so far.
+        - quality: Best cost or hypervolume of the generation, None if it is
+          not measured (target and window are then not checked).
+
+        Returns:
+        - True once a criterion is met, its name is then in self.reason.
+        """
+        if quality is not None:
+            if self._improves(quality):
+                self.best = quality
+                self.stalled = 0
+            else:
+                self.stalled += 1
+        if self.target is not None and quality is not None and (quality >= self.target if self.maximize else quality <= self.target):
+            self.reason = "target"
+        elif self.evaluations is not None and e >= self.evaluations:
+            self.reason = "evaluations"
+        elif self.seconds is not None and self.elapsed() >= self.seconds:
+            self.reason = "time"
+        elif self.window is not None and self.stalled >= self.window:
+            self.reason = "stagnation"
+        return self.reason is not None
+
+    def state(self):
+        """JSON-able progress of the criteria, for checkpoint.save_run."""
+        return {"elapsed": self.elapsed(), "best": self.best, "stalled": self.stalled}
+
+    def restore(self, state):
+        """Continue from a state given by state()."""
+        self.start = time.monotonic()
+        self.previous = state["elapsed"]
+        self.best = state["best"]
+        self.stalled = state["stalled"]
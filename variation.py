@@ -0,0 +1,206 @@
+"""
+Variation operators for the solvers.
+
+The mutation operators make the same changes and draw the same random
+numbers as their DEAP counterparts, but take the whole individual and the
+index of the gene to change (0 for the cities, 1 for the transports of the
+[tour, modes] genomes, None for plain permutations). With record=True they
+also remember, in individual.delta, the fitness the individual had before
+being changed and the previous value of every position they touch, so
+evaluation.delta_cost can update the fitness from the changed legs only.
+
+The batch operators apply the same changes to every row of a 2-D array of
+tours (or transports) at once, with vectorized random masks, and vary_batch
+runs the crossover and mutation step of a solver over its whole offspring
+with them. Their random numbers come from a numpy generator seeded by the
+random module, so --seed and the checkpoints cover them too.
+"""
+
+import random
+
+import numpy as np
+
+
+def _start_record(individual):
+    # A record can only be started on an individual with a known fitness,
+    # otherwise (e.g. after a crossover) it is fully evaluated
+    record = getattr(individual, "delta", None)
+    if record is None and individual.fitness.valid:
+        record = individual.delta = {"base": individual.fitness.values, "cities": {}, "modes": {}}
+    return record
+
+
+def mutShuffleIndexes(individual, indpb, gene=None, record=False):
+    """
+    Shuffle the attributes of the tour, as tools.mutShuffleIndexes.
+
+    Each position is swapped with another random position with probability
+    indpb.
+    """
+    tour = individual if gene is None else individual[gene]
+    delta = _start_record(individual) if record else None
+    changes = delta["cities"] if delta else None
+    size = len(tour)
+    for i in range(size):
+        if random.random() < indpb:
+            swap_indx = random.randint(0, size - 2)
+            if swap_indx >= i:
+                swap_indx += 1
+            if changes is not None:
+                changes.setdefault(i, tour[i])
+                changes.setdefault(swap_indx, tour[swap_indx])
+            tour[i], tour[swap_indx] = tour[swap_indx], tour[i]
+
+    return individual,
+
+
+def mutUniformInt(individual, low, up, indpb, gene=None, record=False):
+    """
+    Replace transports by random integers in [low, up], as tools.mutUniformInt.
+    """
+    modes = individual if gene is None else individual[gene]
+    delta = _start_record(individual) if record else None
+    changes = delta["modes"] if delta else None
+    for i in range(len(modes)):
+        if random.random() < indpb:
+            if changes is not None:
+                changes.setdefault(i, modes[i])
+            modes[i] = random.randint(low, up)
+
+    return individual,
+
+
+def _generator():
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def cxPartialyMatchedBatch(tours1, tours2, rng):
+    """
+    PMX of every row of tours1 with the same row of tours2, in place, as
+    tools.cxPartialyMatched.
+
+    Parameters:
+    - tours1, tours2: (M, N) integer arrays of permutations of range(N).
+    - rng: numpy Generator of the cut points.
+    """
+    m, size = tours1.shape
+    rows = np.arange(m)
+    positions1 = np.empty_like(tours1)
+    positions2 = np.empty_like(tours2)
+    positions1[rows[:, np.newaxis], tours1] = np.arange(size)
+    positions2[rows[:, np.newaxis], tours2] = np.arange(size)
+
+    cx1 = rng.integers(0, size + 1, m)
+    cx2 = rng.integers(0, size, m)
+    cx2 += cx2 >= cx1
+    cx1, cx2 = np.minimum(cx1, cx2), np.maximum(cx1, cx2)
+
+    # Position i of the rows whose section contains it, as the loop of DEAP
+    for i in range(int(cx1.min(initial=size)), int(cx2.max(initial=0))):
+        r = rows[(cx1 <= i) & (i < cx2)]
+        temp1, temp2 = tours1[r, i], tours2[r, i]
+        swap1, swap2 = positions1[r, temp2], positions2[r, temp1]
+        tours1[r, i], tours2[r, i] = temp2, temp1
+        tours1[r, swap1], tours2[r, swap2] = temp1, temp2
+        positions1[r, temp1], positions1[r, temp2] = positions1[r, temp2], positions1[r, temp1]
+        positions2[r, temp1], positions2[r, temp2] = positions2[r, temp2], positions2[r, temp1]
+
+    return tours1, tours2
+
+
+def mutShuffleIndexesBatch(tours, indpb, rng):
+    """
+    mutShuffleIndexes of every row of tours, in place: each position is
+    swapped with another random position of its row with probability indpb.
+    """
+    m, size = tours.shape
+    if size < 2:
+        return tours
+    positions, rows = np.nonzero((rng.random((m, size)) < indpb).T)
+    swaps = rng.integers(0, size - 1, len(rows))
+    swaps += swaps >= positions
+
+    # The swaps of a row are made in order of position
+    bounds = np.searchsorted(positions, np.arange(size + 1))
+    for i in range(size):
+        r, s = rows[bounds[i]:bounds[i + 1]], swaps[bounds[i]:bounds[i + 1]]
+        if len(r):
+            tours[r, i], tours[r, s] = tours[r, s], tours[r, i]
+
+    return tours
+
+
+def mutUniformIntBatch(modes, low, up, indpb, rng):
+    """
+    mutUniformInt of every row of modes, in place: each transport is replaced
+    by a random integer in [low, up] with probability indpb.
+    """
+    mask = rng.random(modes.shape) < indpb
+    modes[mask] = rng.integers(low, up + 1, int(mask.sum()))
+    return modes
+
+
+def vary_batch(offspring, cxpb, mutpb, indpb, transport=False, transportpb=0.0, transportIndpb=0.05, low=0, up=2, record=False):
+    """
+    Crossover and mutation of all the offspring at once, as the loops of the
+    solvers: the pairs (offspring[0], offspring[1]), (offspring[2],
+    offspring[3]), ... are crossed by PMX with probability cxpb, then each
+    tour is shuffled with probability mutpb and, with transport, its
+    transports mutated with probability transportpb.
+
+    The changed individuals are updated in place and their fitness deleted.
+    With record=True the mutants that were not crossed get the delta record
+    of their changed positions, as the record option of the mutations.
+
+    Parameters:
+    - offspring: Cloned individuals, plain permutations or, with transport,
+      [tour, modes] genomes.
+    - indpb, transportIndpb: Probability of changing each city / transport.
+    - low, up: Range of the transports.
+    """
+    m = len(offspring)
+    if m == 0:
+        return offspring
+    rng = _generator()
+    if transport:
+        tours = np.array([ind[0] for ind in offspring], dtype=np.int16)
+        modes = np.array([ind[1] for ind in offspring], dtype=np.int16)
+    else:
+        tours = np.array(offspring, dtype=np.int16)
+    if record:
+        oldTours, oldModes = tours.copy(), modes.copy() if transport else None
+
+    crossed = np.zeros(m, dtype=bool)
+    mates = 2 * np.nonzero(rng.random(m // 2) < cxpb)[0]
+    if len(mates):
+        tours[mates], tours[mates + 1] = cxPartialyMatchedBatch(tours[mates], tours[mates + 1], rng)
+        crossed[mates] = crossed[mates + 1] = True
+
+    changed = crossed.copy()
+    mutants = np.nonzero(rng.random(m) < mutpb)[0]
+    if len(mutants):
+        tours[mutants] = mutShuffleIndexesBatch(tours[mutants], indpb, rng)
+        changed[mutants] = True
+    if transport and transportpb > 0:
+        mutants = np.nonzero(rng.random(m) < transportpb)[0]
+        if len(mutants):
+            modes[mutants] = mutUniformIntBatch(modes[mutants], low, up, transportIndpb, rng)
+            changed[mutants] = True
+
+    for k in np.nonzero(changed)[0].tolist():
+        ind = offspring[k]
+        delta = _start_record(ind) if record and not crossed[k] else None
+        if delta is not None:
+            for i in np.nonzero(tours[k] != oldTours[k])[0].tolist():
+                delta["cities"].setdefault(i, int(oldTours[k, i]))
+            if transport:
+                for i in np.nonzero(modes[k] != oldModes[k])[0].tolist():
+                    delta["modes"].setdefault(i, int(oldModes[k, i]))
+        if transport:
+            ind[0][:] = tours[k]
+            ind[1][:] = modes[k]
+        else:
+            ind[:] = tours[k].tolist()
+        del ind.fitness.values
+
+    return offspring